@@ -17,10 +17,32 @@ __version__ = "0.1.0"
 __author__ = "codervisor"
 __email__ = "codervisor@example.com"
 
-from .models import ChatSession, Message, WorkspaceData
-from .parsers.copilot import CopilotParser
-from .exporters.json import JSONExporter
-from .exporters.markdown import MarkdownExporter
+# Public names are imported on first access so that ``import codehist`` (and
+# every CLI start-up, which imports codehist.cli) doesn't pay for modules the
+# current command never uses.
+_LAZY_IMPORTS = {
+    "ChatSession": ".models",
+    "Message": ".models",
+    "WorkspaceData": ".models",
+    "CopilotParser": ".parsers.copilot",
+    "JSONExporter": ".exporters.json",
+    "MarkdownExporter": ".exporters.markdown",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        import importlib
+
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
+
 
 __all__ = [
     "ChatSession",
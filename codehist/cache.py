@@ -0,0 +1,163 @@
+"""
+On-disk cache for discovered chat data
+
+Stores the parsed WorkspaceData as a pickle under ~/.cache/codehist/ so that
+repeated CLI invocations can skip re-parsing every chat session file. Also
+records which sessions earlier JSON Lines exports wrote, so that later exports
+only append what changed.
+"""
+
+import logging
+import os
+import pickle
+import time
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from . import __version__
+from .fastjson import dumps, loads
+from .models import ChatSession, Message, WorkspaceData, gc_paused
+
+logger = logging.getLogger(__name__)
+
+# Entries older than this are re-parsed even if the fingerprint still matches
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Bump when the pickled entry changes in a way the models' field names don't show
+CACHE_FORMAT_VERSION = 1
+
+
+def get_cache_dir() -> Path:
+    """Get the cache directory, honouring XDG_CACHE_HOME when set."""
+    cache_home = os.environ.get("XDG_CACHE_HOME")
+    base = Path(cache_home) if cache_home else Path.home() / ".cache"
+    return base / "codehist"
+
+
+def get_workspace_cache_path() -> Path:
+    """Get the path of the workspace data pickle."""
+    return get_cache_dir() / "workspace.pkl"
+
+
+def _cache_format() -> Tuple[Any, ...]:
+    """
+    Identify the layout of a cache entry: the format version and the models' fields.
+    
+    Pickles store slot values by name, so an entry written for other fields would
+    load without error and fail later when a missing slot is read.
+    """
+    return (CACHE_FORMAT_VERSION,) + tuple(
+        tuple(f.name for f in fields(model)) for model in (Message, ChatSession, WorkspaceData)
+    )
+
+
+def load_workspace_data(fingerprint: Any, ttl: float = CACHE_TTL_SECONDS) -> Optional[WorkspaceData]:
+    """Load cached workspace data if it matches the given storage fingerprint."""
+    cache_path = get_workspace_cache_path()
+    try:
+        with open(cache_path, "rb") as f, gc_paused():
+            entry = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.debug(f"Ignoring unreadable cache {cache_path}: {e}")
+        return None
+
+    if not isinstance(entry, dict) or entry.get("version") != __version__:
+        return None
+    if entry.get("format") != _cache_format():
+        return None
+    if entry.get("fingerprint") != fingerprint:
+        return None
+    if time.time() - entry.get("created", 0) > ttl:
+        return None
+
+    return entry.get("data")
+
+
+def save_workspace_data(fingerprint: Any, workspace_data: WorkspaceData) -> None:
+    """Save workspace data to the cache, keyed by the storage fingerprint."""
+    cache_path = get_workspace_cache_path()
+    entry = {
+        "version": __version__,
+        "format": _cache_format(),
+        "created": time.time(),
+        "fingerprint": fingerprint,
+        "data": workspace_data,
+    }
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so a concurrent reader never sees a partial pickle
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logger.debug(f"Failed to write cache {cache_path}: {e}")
+
+
+def get_export_state_path() -> Path:
+    """Get the path of the JSON Lines export state file."""
+    return get_cache_dir() / "exports.json"
+
+
+def _read_export_state() -> Dict[str, Any]:
+    try:
+        state = loads(get_export_state_path().read_bytes())
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.debug(f"Ignoring unreadable export state: {e}")
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def load_export_state(output_path: Path) -> Optional[Dict[str, int]]:
+    """
+    Load the message counts by session key written by earlier exports to output_path.
+    
+    Returns None, meaning the file must be rewritten, when there is no record or
+    the file was changed, truncated or removed since the last export.
+    """
+    entry = _read_export_state().get(str(output_path.resolve()))
+    if not isinstance(entry, dict):
+        return None
+    
+    try:
+        size = output_path.stat().st_size
+    except FileNotFoundError:
+        return None
+    if size != entry.get("size"):
+        return None
+    
+    return entry.get("sessions")
+
+
+def save_export_state(output_path: Path, sessions: Dict[str, int]) -> None:
+    """Record the message counts by session key now in output_path."""
+    state_path = get_export_state_path()
+    state = _read_export_state()
+    
+    try:
+        state[str(output_path.resolve())] = {"size": output_path.stat().st_size, "sessions": sessions}
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = state_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(dumps(state))
+        os.replace(tmp_path, state_path)
+    except Exception as e:
+        logger.debug(f"Failed to write export state {state_path}: {e}")
+
+
+def clear_cache() -> bool:
+    """Remove the on-disk workspace cache. Returns True if a cache file was removed."""
+    from .parsers.copilot import _discover_cached
+
+    _discover_cached.cache_clear()
+
+    try:
+        get_workspace_cache_path().unlink()
+        return True
+    except FileNotFoundError:
+        return False
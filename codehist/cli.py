@@ -4,42 +4,87 @@ Simplified CLI for CodeHist - Focus on GitHub Copilot Chat History
 This is the main entry point focusing on the core chat history extraction functionality.
 """
 
+import heapq
 import typer
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from rich.console import Console
-from rich.table import Table
+from rich.markup import escape
 
-from .parsers.copilot import CopilotParser
-from .exporters.json import JSONExporter
-from .exporters.chunked_json import ChunkedJSONExporter
-from .exporters.markdown import MarkdownExporter
+from .cache import (
+    clear_cache,
+    load_export_state,
+    load_workspace_data,
+    save_export_state,
+    save_workspace_data,
+)
+from .models import WorkspaceData
+from .parsers.copilot import DEFAULT_JOBS, CopilotParser
 
 app = typer.Typer(
     name="codehist",
     help="Extract and analyze GitHub Copilot chat history",
     no_args_is_help=True
 )
+cache_app = typer.Typer(help="Manage the chat data discovery cache")
+app.add_typer(cache_app, name="cache")
 console = Console()
 
 
+@app.callback()
+def _boot(ctx: typer.Context):
+    """Extract and analyze GitHub Copilot chat history"""
+    # One parser per invocation, so its compiled search matchers are shared by every command
+    ctx.ensure_object(dict)
+    if "parser" not in ctx.obj:
+        ctx.obj["parser"] = CopilotParser()
+
+
+def _get_workspace_data(parser: CopilotParser, use_cache: bool = True, jobs: int = 1) -> WorkspaceData:
+    """Discover chat data, reusing the on-disk cache while the session files are unchanged."""
+    if not use_cache:
+        return parser.discover_vscode_copilot_data(jobs=jobs)
+    
+    fingerprint = parser.get_storage_fingerprint()
+    workspace_data = load_workspace_data(fingerprint)
+    if workspace_data is None:
+        workspace_data = parser.discover_vscode_copilot_data_cached(fingerprint, jobs=jobs)
+        save_workspace_data(fingerprint, workspace_data)
+    
+    return workspace_data
+
+
+def _build_chat_result(workspace_data: WorkspaceData, stats: dict, search_results: Optional[list] = None) -> dict:
+    """Build the full export document for exporters that need it as a dict."""
+    result = {
+        "chat_data": workspace_data.to_dict(),
+        "statistics": stats
+    }
+    if search_results is not None:
+        result["search_results"] = search_results
+    return result
+
+
 @app.command()
 def chat(
+    ctx: typer.Context,
     output: Optional[str] = typer.Option(None, "--output", "-o", help="Output file path"),
-    format: str = typer.Option("json", "--format", "-f", help="Output format (json, md, csv, parquet)"),
+    format: str = typer.Option("json", "--format", "-f", help="Output format (json, ndjson, jsonl, msgpack, md, csv, parquet)"),
     search: Optional[str] = typer.Option(None, "--search", "-s", help="Search query for chat content"),
     chunked: bool = typer.Option(False, "--chunked", "-c", help="Use chunked processing for large datasets"),
     chunk_size: int = typer.Option(100, "--chunk-size", help="Number of sessions per chunk (default: 100)"),
-    verbose: bool = typer.Option(False, "--verbose", "-v", help="Show detailed progress")
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Show detailed progress"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Re-parse chat data instead of using the cache"),
+    jobs: int = typer.Option(DEFAULT_JOBS, "--jobs", "-j", help="Worker processes for parsing and chunked export")
 ):
     """Extract and analyze GitHub Copilot chat history."""
     try:
-        parser = CopilotParser()
+        parser = ctx.obj["parser"]
         
         if verbose:
             console.print("[yellow]Discovering GitHub Copilot chat data...[/yellow]")
         
-        workspace_data = parser.discover_vscode_copilot_data()
+        workspace_data = _get_workspace_data(parser, use_cache=not no_cache, jobs=jobs)
         
         if not workspace_data.chat_sessions and not workspace_data.metadata:
             console.print("[red]No GitHub Copilot chat data found[/red]")
@@ -48,19 +93,15 @@ def chat(
         
         console.print(f"[green]Found {len(workspace_data.chat_sessions)} chat sessions[/green]")
         
-        # Get statistics
-        stats = parser.get_chat_statistics(workspace_data)
-        
-        result = {
-            "chat_data": workspace_data.to_dict(),
-            "statistics": stats
-        }
+        # Statistics are only needed for the console summary and the formats that embed them
+        stats = None
+        if not output or format in ("json", "ndjson", "msgpack", "md"):
+            stats = parser.get_chat_statistics(workspace_data)
         
         # Search if query provided
         search_results = []
         if search:
             search_results = parser.search_chat_content(workspace_data, search)
-            result["search_results"] = search_results
             console.print(f"[green]Found {len(search_results)} matches for '{search}'[/green]")
         
         # Output results
@@ -69,25 +110,72 @@ def chat(
             
             if format == "json":
                 if chunked:
+                    from .exporters.chunked_json import ChunkedJSONExporter
+                    
                     if verbose:
                         console.print("[yellow]Using chunked processing for large dataset...[/yellow]")
                     exporter = ChunkedJSONExporter(chunk_size=chunk_size)
-                    exporter.export_data_chunked(result, output_path)
+                    exporter.export_data_chunked(
+                        _build_chat_result(workspace_data, stats, search_results if search else None),
+                        output_path,
+                        jobs=jobs
+                    )
                 else:
+                    from .exporters.json import JSONExporter
+                    
                     exporter = JSONExporter()
-                    exporter.export_data(result, output_path)
+                    exporter.export_data_streaming(
+                        workspace_data, stats, output_path,
+                        search_results=search_results if search else None
+                    )
+            elif format == "ndjson":
+                from .exporters.json import JSONExporter
+                
+                exporter = JSONExporter()
+                exporter.export_ndjson(
+                    workspace_data, stats, output_path,
+                    search_results=search_results if search else None
+                )
+            elif format == "jsonl":
+                from .exporters.json import JSONExporter
+                
+                # Append only new or grown sessions to a file an earlier export wrote
+                exporter = JSONExporter()
+                written, exported = exporter.export_sessions_jsonl(
+                    workspace_data, output_path, exported=load_export_state(output_path)
+                )
+                save_export_state(output_path, exported)
+                if verbose:
+                    console.print(f"[yellow]Wrote {written} new or updated sessions[/yellow]")
+            elif format == "msgpack":
+                from .exporters.chunked_json import ChunkedJSONExporter
+                
+                exporter = ChunkedJSONExporter()
+                exporter.export_data_msgpack(
+                    _build_chat_result(workspace_data, stats, search_results if search else None),
+                    output_path
+                )
             elif format == "md":
+                from .exporters.markdown import MarkdownExporter
+                
                 exporter = MarkdownExporter()
-                exporter.export_chat_data(result, output_path)
+                exporter.export_chat_data(
+                    _build_chat_result(workspace_data, stats, search_results if search else None),
+                    output_path
+                )
             elif format == "csv":
+                from .exporters.chunked_json import ChunkedJSONExporter
+                
                 exporter = ChunkedJSONExporter()
                 exporter.export_sessions_to_csv(workspace_data, output_path, include_message_content=True)
             elif format == "parquet":
+                from .exporters.chunked_json import ChunkedJSONExporter
+                
                 exporter = ChunkedJSONExporter()
                 exporter.export_messages_to_parquet(workspace_data, output_path)
             else:
                 console.print(f"[red]Unsupported format: {format}[/red]")
-                console.print("[yellow]Supported formats: json, md, csv, parquet[/yellow]")
+                console.print("[yellow]Supported formats: json, ndjson, jsonl, msgpack, md, csv, parquet[/yellow]")
                 raise typer.Exit(1)
             
             console.print(f"[green]Chat data saved to {output_path}[/green]")
@@ -104,11 +192,15 @@ def chat(
 
 
 @app.command()
-def stats():
+def stats(
+    ctx: typer.Context,
+    no_cache: bool = typer.Option(False, "--no-cache", help="Re-parse chat data instead of using the cache"),
+    jobs: int = typer.Option(DEFAULT_JOBS, "--jobs", "-j", help="Worker processes for parsing chat data")
+):
     """Show statistics about available chat data."""
     try:
-        parser = CopilotParser()
-        workspace_data = parser.discover_vscode_copilot_data()
+        parser = ctx.obj["parser"]
+        workspace_data = _get_workspace_data(parser, use_cache=not no_cache, jobs=jobs)
         
         if not workspace_data.chat_sessions:
             console.print("[red]No chat sessions found[/red]")
@@ -117,6 +209,8 @@ def stats():
         stats = parser.get_chat_statistics(workspace_data)
         
         # Display detailed statistics
+        from rich.table import Table
+        
         table = Table(title="GitHub Copilot Chat Statistics")
         table.add_column("Metric", style="cyan")
         table.add_column("Value", style="green")
@@ -129,21 +223,25 @@ def stats():
         
         console.print(table)
         
+        # Build the remaining sections first and render them with a single print;
+        # names come from chat data and are escaped so they can't inject markup
+        lines = []
+        
         # Session types
         if stats["session_types"]:
-            console.print("\n[bold blue]Session Types:[/bold blue]")
+            lines.append("\n[bold blue]Session Types:[/bold blue]")
             for session_type, count in stats["session_types"].items():
-                console.print(f"  • {session_type}: {count}")
+                lines.append(f"  • {escape(session_type)}: {count}")
         
         # Message types
         if stats["message_types"]:
-            console.print("\n[bold blue]Message Types:[/bold blue]")
+            lines.append("\n[bold blue]Message Types:[/bold blue]")
             for msg_type, count in stats["message_types"].items():
-                console.print(f"  • {msg_type}: {count}")
+                lines.append(f"  • {escape(msg_type)}: {count}")
         
         # Workspace activity
         if stats.get("workspace_activity"):
-            console.print("\n[bold blue]Workspace Activity:[/bold blue]")
+            lines.append("\n[bold blue]Workspace Activity:[/bold blue]")
             sorted_workspaces = sorted(
                 stats["workspace_activity"].items(), 
                 key=lambda x: x[1]["sessions"], 
@@ -151,7 +249,10 @@ def stats():
             )
             for workspace, activity in sorted_workspaces:
                 workspace_name = workspace if workspace != "unknown_workspace" else "Unknown"
-                console.print(f"  • {workspace_name}: {activity['sessions']} sessions, {activity['messages']} messages")
+                lines.append(f"  • {escape(workspace_name)}: {activity['sessions']} sessions, {activity['messages']} messages")
+        
+        if lines:
+            console.print("\n".join(lines))
         
     except Exception as e:
         console.print(f"[red]Error getting statistics: {e}[/red]")
@@ -160,39 +261,60 @@ def stats():
 
 @app.command()
 def search(
-    query: str = typer.Argument(..., help="Search query"),
+    ctx: typer.Context,
+    query: Optional[List[str]] = typer.Argument(None, help="Search query (multiple terms match any of them)"),
     limit: int = typer.Option(10, "--limit", "-l", help="Maximum results to show"),
-    case_sensitive: bool = typer.Option(False, "--case-sensitive", "-c", help="Case sensitive search")
+    case_sensitive: bool = typer.Option(False, "--case-sensitive", "-c", help="Case sensitive search"),
+    regex: bool = typer.Option(False, "--regex", "-r", help="Treat queries as regular expressions"),
+    patterns_file: Optional[Path] = typer.Option(None, "--patterns-file", "-p", help="Read additional queries from a file, one per line"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Re-parse chat data instead of using the cache"),
+    jobs: int = typer.Option(DEFAULT_JOBS, "--jobs", "-j", help="Worker processes for parsing chat data")
 ):
     """Search for content in chat history."""
     try:
-        parser = CopilotParser()
-        workspace_data = parser.discover_vscode_copilot_data()
+        queries = list(query or [])
+        if patterns_file:
+            with open(patterns_file, encoding="utf-8") as f:
+                queries.extend(line.strip() for line in f if line.strip())
+        
+        if not queries:
+            console.print("[red]No search query given[/red]")
+            raise typer.Exit(1)
+        
+        parser = ctx.obj["parser"]
+        workspace_data = _get_workspace_data(parser, use_cache=not no_cache, jobs=jobs)
         
         if not workspace_data.chat_sessions:
             console.print("[red]No chat sessions found[/red]")
             return
         
-        search_results = parser.search_chat_content(workspace_data, query, case_sensitive)
+        search_query = queries[0] if len(queries) == 1 else queries
+        query_label = escape(", ".join(queries))
+        search_results = parser.search_chat_content(workspace_data, search_query, case_sensitive, regex=regex)
         
         if not search_results:
-            console.print(f"[yellow]No matches found for '{query}'[/yellow]")
+            console.print(f"[yellow]No matches found for '{query_label}'[/yellow]")
             return
         
-        console.print(f"[green]Found {len(search_results)} matches for '{query}'[/green]")
+        console.print(f"[green]Found {len(search_results)} matches for '{query_label}'[/green]")
         
-        # Display results
+        # Display results with a single print; context is chat content and is escaped
+        lines = []
         for i, result in enumerate(search_results[:limit], 1):
-            console.print(f"\n[bold blue]Match {i}:[/bold blue]")
-            console.print(f"  Session: {result['session_id']}")
-            console.print(f"  Role: {result['role']}")
-            console.print(f"  Context: {result['context'][:200]}...")
+            lines.append(f"\n[bold blue]Match {i}:[/bold blue]")
+            lines.append(f"  Session: {escape(str(result['session_id']))}")
+            lines.append(f"  Role: {result['role']}")
+            lines.append(f"  Context: {escape(result['context'][:200])}...")
         
         if len(search_results) > limit:
-            console.print(f"\n[yellow]... and {len(search_results) - limit} more matches[/yellow]")
+            lines.append(f"\n[yellow]... and {len(search_results) - limit} more matches[/yellow]")
+        
+        console.print("\n".join(lines))
     
+    except typer.Exit:
+        raise
     except Exception as e:
-        console.print(f"[red]Error searching: {e}[/red]")
+        console.print(f"[red]Error searching: {escape(str(e))}[/red]")
         raise typer.Exit(1)
 
 
@@ -219,12 +341,22 @@ def analyze(
             console.print(f"[green]File size: {analysis.get('file_size_mb', 0):.1f} MB[/green]")
             if analysis.get('contains_sessions'):
                 console.print("[green]✓ Contains chat session data[/green]")
+                console.print(f"[green]Message entries: ~{analysis.get('role_entries', 0)}[/green]")
         
     except Exception as e:
         console.print(f"[red]Error analyzing file: {e}[/red]")
         raise typer.Exit(1)
 
 
+@cache_app.command("clear")
+def cache_clear():
+    """Remove cached chat data so the next command re-parses everything."""
+    if clear_cache():
+        console.print("[green]Cache cleared[/green]")
+    else:
+        console.print("[yellow]Cache is already empty[/yellow]")
+
+
 def _display_chat_summary(stats: dict, search_results: list = None, verbose: bool = False):
     """Display a summary of chat statistics."""
     console.print("\n[bold blue]📊 Chat History Summary[/bold blue]")
@@ -246,12 +378,12 @@ def _display_chat_summary(stats: dict, search_results: list = None, verbose: boo
     
     if verbose and stats.get("workspace_activity"):
         console.print("\n[bold]Workspaces:[/bold]")
-        sorted_workspaces = sorted(
-            stats["workspace_activity"].items(), 
-            key=lambda x: x[1]["sessions"], 
-            reverse=True
+        top_workspaces = heapq.nlargest(
+            5,  # Show top 5 workspaces
+            stats["workspace_activity"].items(),
+            key=lambda x: x[1]["sessions"]
         )
-        for workspace, activity in sorted_workspaces[:5]:  # Show top 5 workspaces
+        for workspace, activity in top_workspaces:
             workspace_name = workspace if workspace != "unknown_workspace" else "Unknown"
             console.print(f"  {workspace_name}: {activity['sessions']} sessions, {activity['messages']} messages")
     
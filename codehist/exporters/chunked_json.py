@@ -1,22 +1,47 @@
 """
-Chunked JSON exporter for CodeHist chat data using pandas
+Chunked JSON exporter for CodeHist chat data
 
 Handles large chat session exports by processing data in chunks to manage memory usage.
 """
 
-import json
-import pandas as pd
+import csv
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from operator import attrgetter
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Iterator
-from datetime import datetime
-import tempfile
+from datetime import datetime, timezone
+from functools import lru_cache
+import mmap
 import os
 
+from .. import fastjson
+from ..fastjson import dumps
 from ..models import ChatSession, Message, WorkspaceData
+from .json import WRITE_BUFFER_SIZE, JSONExporter
 
+# pyarrow and msgpack are imported inside the methods that use them so that loading this
+# module (e.g. for analyze_json_file_chunks) stays cheap
 
-class ChunkedJSONExporter:
-    """JSON exporter that processes large chat data in chunks using pandas"""
+# Below this many chunks, starting worker processes costs more than it saves
+MIN_PARALLEL_CHUNKS = 4
+
+# Columns of the session summary CSV, before the optional first_user_message
+CSV_SESSION_FIELDS = (
+    'session_id', 'agent', 'timestamp', 'workspace', 'message_count', 'user_messages',
+    'assistant_messages', 'system_messages', 'total_chars', 'avg_message_length'
+)
+
+# Parquet columns with few distinct values, and the zstd level used for all columns
+PARQUET_CATEGORY_COLUMNS = ('session_id', 'role', 'agent', 'workspace')
+PARQUET_ZSTD_LEVEL = 3
+
+_get_role = attrgetter('role')
+_get_content = attrgetter('content')
+
+
+class ChunkedJSONExporter(JSONExporter):
+    """JSON exporter that processes large chat data in chunks"""
     
     def __init__(self, chunk_size: int = 100):
         """
@@ -32,7 +57,8 @@ class ChunkedJSONExporter:
         data: Dict[str, Any], 
         output_path: Path,
         chunk_sessions: bool = True,
-        chunk_messages: bool = True
+        chunk_messages: bool = True,
+        jobs: int = 1
     ) -> None:
         """
         Export data in chunks to manage memory usage
@@ -41,7 +67,9 @@ class ChunkedJSONExporter:
             data: Full data dictionary containing chat_data and statistics
             output_path: Path to output file
             chunk_sessions: Whether to chunk by sessions
-            chunk_messages: Whether to chunk messages within sessions
+            chunk_messages: Unused, kept for backwards compatibility
+            jobs: Number of worker processes encoding chunks in parallel when
+                orjson is not installed
         """
         # Ensure output directory exists
         output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -56,102 +84,54 @@ class ChunkedJSONExporter:
             return
         
         print(f"Processing {len(chat_sessions)} sessions in chunks of {self.chunk_size}")
+        total_chunks = (len(chat_sessions) + self.chunk_size - 1) // self.chunk_size
         
-        # Create temporary directory for chunk files
-        with tempfile.TemporaryDirectory() as temp_dir:
-            chunk_files = []
+        # Stream each processed chunk straight into the output file. Statistics and
+        # search results come first and the sessions last, so only one chunk is
+        # held in memory at a time
+        with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(b'{\n')
+            f.write(self._encode_field('statistics', data.get('statistics', {}), 1) + b',\n')
+            f.write(self._encode_field('search_results', data.get('search_results', []), 1) + b',\n')
+            f.write(b'  "chat_data": {\n')
+            f.write(self._encode_field('agent', chat_data.get('agent', 'GitHub Copilot'), 2) + b',\n')
+            f.write(self._encode_field('version', chat_data.get('version'), 2) + b',\n')
+            f.write(self._encode_field('workspace_path', chat_data.get('workspace_path'), 2) + b',\n')
+            f.write(self._encode_field('metadata', chat_data.get('metadata', {}), 2) + b',\n')
+            f.write(b'    "chat_sessions": [\n')
             
-            # Process sessions in chunks
-            for chunk_idx, session_chunk in enumerate(self._chunk_sessions(chat_sessions)):
-                chunk_file = Path(temp_dir) / f"chunk_{chunk_idx:04d}.json"
-                chunk_files.append(chunk_file)
-                
-                # Process chunk using pandas
-                self._process_chunk_with_pandas(
-                    session_chunk, 
-                    chunk_file,
-                    chunk_messages=chunk_messages
-                )
+            # orjson encodes faster than the session dicts can be pickled to a worker,
+            # so only the pure-Python stdlib encoder is worth spreading across processes
+            executor = None
+            if jobs > 1 and total_chunks >= MIN_PARALLEL_CHUNKS and fastjson.orjson is None:
+                try:
+                    executor = ProcessPoolExecutor(max_workers=jobs)
+                except OSError as e:
+                    print(f"Parallel encoding unavailable, using a single process: {e}")
+            
+            try:
+                chunks = self._chunk_sessions(chat_sessions)
+                # Workers encode chunks out of order; map() still yields them in order
+                encoded_chunks = executor.map(_encode_session_chunk, chunks) if executor else map(_encode_session_chunk, chunks)
                 
-                print(f"Processed chunk {chunk_idx + 1}/{(len(chat_sessions) + self.chunk_size - 1) // self.chunk_size}")
+                for chunk_idx, encoded in enumerate(encoded_chunks):
+                    if chunk_idx:
+                        f.write(b',\n')
+                    f.write(encoded)
+                    print(f"Processed chunk {chunk_idx + 1}/{total_chunks}")
+            finally:
+                if executor is not None:
+                    executor.shutdown()
             
-            # Combine chunks into final output
-            self._combine_chunks(chunk_files, data, output_path)
+            f.write(b'\n    ]\n  }\n}')
+        
+        print(f"Wrote {len(chat_sessions)} sessions from {total_chunks} chunks")
     
     def _chunk_sessions(self, sessions: List[Dict]) -> Iterator[List[Dict]]:
         """Split sessions into chunks"""
         for i in range(0, len(sessions), self.chunk_size):
             yield sessions[i:i + self.chunk_size]
     
-    def _process_chunk_with_pandas(
-        self, 
-        session_chunk: List[Dict], 
-        chunk_file: Path,
-        chunk_messages: bool = True
-    ) -> None:
-        """Process a chunk of sessions using pandas for efficient handling"""
-        processed_sessions = []
-        
-        for session_dict in session_chunk:
-            # Convert messages to DataFrame for efficient processing
-            messages = session_dict.get('messages', [])
-            
-            if messages and chunk_messages:
-                # Create DataFrame from messages
-                df_messages = pd.DataFrame(messages)
-                
-                # Process messages in smaller chunks if needed
-                if len(df_messages) > 1000:  # Large session
-                    processed_messages = []
-                    for msg_chunk in self._chunk_dataframe(df_messages, 1000):
-                        processed_messages.extend(msg_chunk.to_dict('records'))
-                    session_dict['messages'] = processed_messages
-                else:
-                    # Convert back to dict records
-                    session_dict['messages'] = df_messages.to_dict('records')
-            
-            processed_sessions.append(session_dict)
-        
-        # Write chunk to file
-        with open(chunk_file, 'w', encoding='utf-8') as f:
-            json.dump(processed_sessions, f, indent=2, default=self._json_serializer)
-    
-    def _chunk_dataframe(self, df: pd.DataFrame, chunk_size: int) -> Iterator[pd.DataFrame]:
-        """Split DataFrame into chunks"""
-        for i in range(0, len(df), chunk_size):
-            yield df.iloc[i:i + chunk_size]
-    
-    def _combine_chunks(self, chunk_files: List[Path], original_data: Dict, output_path: Path) -> None:
-        """Combine processed chunks into final output file"""
-        print("Combining chunks into final output...")
-        
-        # Start building final structure
-        final_data = {
-            'statistics': original_data.get('statistics', {}),
-            'search_results': original_data.get('search_results', []),
-            'chat_data': {
-                'agent': original_data.get('chat_data', {}).get('agent', 'GitHub Copilot'),
-                'version': original_data.get('chat_data', {}).get('version'),
-                'workspace_path': original_data.get('chat_data', {}).get('workspace_path'),
-                'metadata': original_data.get('chat_data', {}).get('metadata', {}),
-                'chat_sessions': []
-            }
-        }
-        
-        # Read and combine chunks
-        total_sessions = 0
-        for chunk_file in chunk_files:
-            with open(chunk_file, 'r', encoding='utf-8') as f:
-                chunk_sessions = json.load(f)
-                final_data['chat_data']['chat_sessions'].extend(chunk_sessions)
-                total_sessions += len(chunk_sessions)
-        
-        print(f"Combined {total_sessions} sessions from {len(chunk_files)} chunks")
-        
-        # Write final output
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(final_data, f, indent=2, default=self._json_serializer)
-    
     def export_sessions_to_csv(
         self, 
         workspace_data: WorkspaceData, 
@@ -166,35 +146,43 @@ class ChunkedJSONExporter:
             output_path: Path to CSV output file
             include_message_content: Whether to include full message content
         """
-        sessions_data = []
+        fieldnames = list(CSV_SESSION_FIELDS)
+        if include_message_content:
+            fieldnames.append('first_user_message')
         
-        for session in workspace_data.chat_sessions:
-            session_info = {
-                'session_id': session.session_id,
-                'agent': session.agent,
-                'timestamp': session.timestamp,
-                'workspace': session.workspace or 'unknown_workspace',
-                'message_count': len(session.messages),
-                'user_messages': len([m for m in session.messages if m.role == 'user']),
-                'assistant_messages': len([m for m in session.messages if m.role == 'assistant']),
-                'system_messages': len([m for m in session.messages if m.role == 'system']),
-                'total_chars': sum(len(m.content) for m in session.messages),
-                'avg_message_length': sum(len(m.content) for m in session.messages) / len(session.messages) if session.messages else 0
-            }
+        session_count = 0
+        # Rows are written as they are computed, matching the layout pandas' to_csv produced
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator='\n')
+            writer.writeheader()
             
-            if include_message_content:
-                # Add sample of first user message
-                user_messages = [m for m in session.messages if m.role == 'user']
-                if user_messages:
-                    first_user_msg = user_messages[0].content[:200]  # First 200 chars
+            for session in workspace_data.chat_sessions:
+                messages = session.messages
+                role_counts = Counter(map(_get_role, messages))
+                total_chars = sum(map(len, map(_get_content, messages)))
+                
+                session_info = {
+                    'session_id': session.session_id,
+                    'agent': session.agent,
+                    'timestamp': session.timestamp,
+                    'workspace': session.workspace or 'unknown_workspace',
+                    'message_count': len(messages),
+                    'user_messages': role_counts['user'],
+                    'assistant_messages': role_counts['assistant'],
+                    'system_messages': role_counts['system'],
+                    'total_chars': total_chars,
+                    'avg_message_length': total_chars / len(messages) if messages else 0.0
+                }
+                
+                if include_message_content and role_counts['user']:
+                    # Add sample of first user message
+                    first_user_msg = next(m for m in messages if m.role == 'user').content[:200]  # First 200 chars
                     session_info['first_user_message'] = first_user_msg
-            
-            sessions_data.append(session_info)
+                
+                writer.writerow(session_info)
+                session_count += 1
         
-        # Create DataFrame and export to CSV
-        df = pd.DataFrame(sessions_data)
-        df.to_csv(output_path, index=False)
-        print(f"Exported {len(sessions_data)} session summaries to {output_path}")
+        print(f"Exported {session_count} session summaries to {output_path}")
     
     def export_messages_to_parquet(
         self, 
@@ -208,80 +196,178 @@ class ChunkedJSONExporter:
         Args:
             workspace_data: Workspace data containing sessions
             output_path: Path to Parquet output file
-            chunk_size: Number of messages per chunk
+            chunk_size: Number of messages per Parquet row group
         """
-        all_messages = []
+        import pyarrow as pa
+        import pyarrow.parquet as pq
         
-        for session in workspace_data.chat_sessions:
-            for message in session.messages:
-                message_data = {
-                    'session_id': session.session_id,
-                    'message_id': message.id,
-                    'role': message.role,
-                    'content': message.content,
-                    'timestamp': message.timestamp,
-                    'content_length': len(message.content),
-                    'agent': session.agent,
-                    'workspace': session.workspace
-                }
-                all_messages.append(message_data)
+        # A fixed schema keeps every row group identical and skips type inference
+        schema = _messages_parquet_schema()
+        total_messages = 0
+        content_chars = 0
+        batch = []
+        
+        def write_batch(writer: "pq.ParquetWriter") -> None:
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema), row_group_size=chunk_size)
+        
+        # Messages are written one row group at a time, so at most chunk_size are held in memory
+        with pq.ParquetWriter(
+            output_path,
+            schema,
+            compression='zstd',
+            compression_level=PARQUET_ZSTD_LEVEL,
+            use_dictionary=True
+        ) as writer:
+            for session in workspace_data.chat_sessions:
+                for message in session.messages:
+                    content_length = len(message.content)
+                    content_chars += content_length
+                    message_data = {
+                        'session_id': session.session_id,
+                        'message_id': message.id,
+                        'role': message.role,
+                        'content': message.content,
+                        'timestamp': _to_utc(message.timestamp),
+                        'content_length': content_length,
+                        'agent': session.agent,
+                        'workspace': session.workspace
+                    }
+                    batch.append(message_data)
+                    
+                    if len(batch) >= chunk_size:
+                        write_batch(writer)
+                        total_messages += len(batch)
+                        batch = []
+            
+            if batch:
+                write_batch(writer)
+                total_messages += len(batch)
+        
+        print(f"Exported {total_messages} messages to {output_path}")
+        print(f"Message content totals ~{content_chars / 1024 / 1024:.1f}MB before compression")
+    
+    def export_data_msgpack(self, data: Dict[str, Any], output_path: Path) -> None:
+        """
+        Export data to a MessagePack file, a compact binary form that reloads much faster than JSON
+        
+        The document has the same structure as the JSON export. Sessions are packed
+        one at a time, and datetimes are stored as ISO strings like in JSON.
+        Requires the msgpack package (in the "export" extra).
         
-        # Create DataFrame
-        df = pd.DataFrame(all_messages)
+        Args:
+            data: Full data dictionary containing chat_data and statistics
+            output_path: Path to output file
+        """
+        import msgpack
         
-        # Export to Parquet (automatically compressed)
-        df.to_parquet(output_path, index=False)
-        print(f"Exported {len(all_messages)} messages to {output_path}")
-        print(f"Original size would be ~{len(str(all_messages)) / 1024 / 1024:.1f}MB, Parquet is much smaller")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        packer = msgpack.Packer(default=self._json_serializer, use_bin_type=True)
+        
+        with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(packer.pack_map_header(len(data)))
+            for key, value in data.items():
+                f.write(packer.pack(key))
+                if key != 'chat_data' or not isinstance(value, dict):
+                    f.write(packer.pack(value))
+                    continue
+                
+                f.write(packer.pack_map_header(len(value)))
+                for chat_key, chat_value in value.items():
+                    f.write(packer.pack(chat_key))
+                    if chat_key == 'chat_sessions' and isinstance(chat_value, list):
+                        f.write(packer.pack_array_header(len(chat_value)))
+                        for session in chat_value:
+                            f.write(packer.pack(session))
+                    else:
+                        f.write(packer.pack(chat_value))
     
     def _export_simple(self, data: Dict[str, Any], output_path: Path) -> None:
         """Simple export fallback for small datasets"""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, default=self._json_serializer)
+        with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(dumps(data, indent=True, default=self._json_serializer))
+
+
+def _encode_session_chunk(session_chunk: List[Dict]) -> bytes:
+    """Encode a chunk of session dicts as indented chat_sessions array items (process pool entry point)"""
+    exporter = JSONExporter()
+    return b',\n'.join(b'      ' + exporter._encode(session_dict, 3) for session_dict in session_chunk)
+
+
+def _to_utc(timestamp: datetime) -> datetime:
+    """Make a timestamp aware for the UTC Parquet column; naive ones are local time, as from fromtimestamp()"""
+    if timestamp.tzinfo is None:
+        return timestamp.astimezone(timezone.utc)
+    return timestamp
+
+
+@lru_cache(maxsize=None)
+def _messages_parquet_schema() -> Any:
+    """Arrow schema of the Parquet message export, with the repeated columns dictionary encoded"""
+    import pyarrow as pa
     
-    def _json_serializer(self, obj):
-        """Custom JSON serializer for objects that aren't JSON serializable by default"""
-        if hasattr(obj, 'to_dict'):
-            return obj.to_dict()
-        elif hasattr(obj, 'isoformat'):  # datetime objects
-            return obj.isoformat()
-        elif hasattr(obj, '__dict__'):  # Generic objects
-            return obj.__dict__
-        else:
-            return str(obj)
+    categorical = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        (name, categorical if name in PARQUET_CATEGORY_COLUMNS else type_)
+        for name, type_ in (
+            ('session_id', pa.string()),
+            ('message_id', pa.string()),
+            ('role', pa.string()),
+            ('content', pa.string()),
+            ('timestamp', pa.timestamp('us', tz='UTC')),
+            ('content_length', pa.int64()),
+            ('agent', pa.string()),
+            ('workspace', pa.string()),
+        )
+    ])
 
 
 def analyze_json_file_chunks(file_path: Path, chunk_size: int = 1000) -> Dict[str, Any]:
     """
-    Analyze a large JSON file by reading it in chunks
+    Analyze a large JSON file without loading it
+    
+    The file is memory-mapped and scanned with C-level bytes searches, so only
+    the pages the kernel needs are read and no Python objects are built.
     
     Args:
         file_path: Path to JSON file
-        chunk_size: Number of sessions to read per chunk
+        chunk_size: Unused, kept for backwards compatibility
     
     Returns:
         Analysis results
     """
     try:
-        # Read just the structure first
-        with open(file_path, 'r') as f:
-            # Read first part to get structure
-            partial_content = f.read(10000)  # First 10KB
-            
-        if 'chat_sessions' in partial_content:
+        file_size = os.path.getsize(file_path)
+        contains_sessions = False
+        role_entries = 0
+        
+        # mmap cannot map an empty file
+        if file_size:
+            with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                contains_sessions = mm.find(b'"chat_sessions"') != -1
+                if contains_sessions:
+                    # Every message has a "role" key (as do search results, if present)
+                    role_entries = _count_occurrences(mm, b'"role":')
+        
+        if contains_sessions:
             print(f"File {file_path.name} appears to contain chat session data")
-            
-            # For large files, we could implement streaming JSON parsing
-            # For now, let's get basic file info
-            file_size = file_path.stat().st_size
-            print(f"File size: {file_size / 1024 / 1024:.1f} MB")
-            
-            return {
-                'file_size_mb': file_size / 1024 / 1024,
-                'contains_sessions': True,
-                'analysis_method': 'partial_read'
-            }
+        print(f"File size: {file_size / 1024 / 1024:.1f} MB")
+        
+        return {
+            'file_size_mb': file_size / 1024 / 1024,
+            'contains_sessions': contains_sessions,
+            'role_entries': role_entries,
+            'analysis_method': 'mmap_scan'
+        }
         
     except Exception as e:
         print(f"Error analyzing file: {e}")
         return {'error': str(e)}
+
+
+def _count_occurrences(mm: mmap.mmap, needle: bytes, window: int = 64 * 1024 * 1024) -> int:
+    """Count occurrences of a needle that cannot overlap itself, one window at a time"""
+    count = 0
+    for start in range(0, len(mm), window):
+        # Extend each window so matches straddling its end are counted exactly once
+        count += mm[start:start + window + len(needle) - 1].count(needle)
+    return count
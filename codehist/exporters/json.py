@@ -4,29 +4,163 @@ Simple JSON exporter for CodeHist chat data
 Simplified version without complex configuration.
 """
 
-import json
+from dataclasses import asdict, is_dataclass
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
+from ..fastjson import dumps, indent_block
+from ..models import ChatSession, WorkspaceData
+
+# Large exports are written through a 1 MiB buffer to keep write() syscalls few
+WRITE_BUFFER_SIZE = 1 << 20
+
 
 class JSONExporter:
     """Simple JSON exporter for chat data"""
     
     def export_data(self, data: Dict[str, Any], output_path: Path) -> None:
         """Export arbitrary data to JSON file"""
-        # Get JSON export options
-        json_options = {
-            "indent": 2,
-            "ensure_ascii": False
-        }
-        
         # Ensure output directory exists
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
         # Write JSON file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, **json_options, default=self._json_serializer)
+        with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(dumps(data, indent=True, default=self._json_serializer))
+    
+    def export_data_streaming(
+        self,
+        workspace_data: WorkspaceData,
+        statistics: Dict[str, Any],
+        output_path: Path,
+        search_results: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Export workspace data to a JSON file one session at a time
+        
+        Writes the same document as export_data() would for
+        {"chat_data": workspace_data.to_dict(), "statistics": ..., "search_results": ...},
+        but only one session is converted to a dict at any time.
+        
+        Args:
+            workspace_data: Workspace data containing sessions
+            statistics: Statistics from CopilotParser.get_chat_statistics
+            output_path: Path to output file
+            search_results: Optional search results to include
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(b'{\n  "chat_data": {\n')
+            for key in ('agent', 'version', 'workspace_path'):
+                f.write(self._encode_field(key, getattr(workspace_data, key), 2) + b',\n')
+            
+            if workspace_data.chat_sessions:
+                f.write(b'    "chat_sessions": [\n')
+                for index, session in enumerate(workspace_data.chat_sessions):
+                    if index:
+                        f.write(b',\n')
+                    f.write(b'      ' + self._encode(session.to_dict(), 3))
+                f.write(b'\n    ],\n')
+            else:
+                f.write(b'    "chat_sessions": [],\n')
+            
+            f.write(self._encode_field('metadata', workspace_data.metadata, 2) + b'\n  },\n')
+            f.write(self._encode_field('statistics', statistics, 1))
+            if search_results is not None:
+                f.write(b',\n' + self._encode_field('search_results', search_results, 1))
+            f.write(b'\n}')
+    
+    def export_ndjson(
+        self,
+        workspace_data: WorkspaceData,
+        statistics: Dict[str, Any],
+        output_path: Path,
+        search_results: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Export workspace data as newline-delimited JSON
+        
+        The first line holds the statistics, search results (if any) and the
+        chat_data fields other than chat_sessions. Each following line is one
+        session, so consumers can read the file one line at a time.
+        
+        Args:
+            workspace_data: Workspace data containing sessions
+            statistics: Statistics from CopilotParser.get_chat_statistics
+            output_path: Path to output file
+            search_results: Optional search results to include
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        header = {
+            "statistics": statistics,
+            "chat_data": {
+                "agent": workspace_data.agent,
+                "version": workspace_data.version,
+                "workspace_path": workspace_data.workspace_path,
+                "metadata": workspace_data.metadata
+            }
+        }
+        if search_results is not None:
+            header["search_results"] = search_results
+        
+        with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(dumps(header, default=self._json_serializer) + b'\n')
+            for session in workspace_data.chat_sessions:
+                f.write(dumps(session.to_dict(), default=self._json_serializer) + b'\n')
+    
+    def export_sessions_jsonl(
+        self,
+        workspace_data: WorkspaceData,
+        output_path: Path,
+        exported: Optional[Dict[str, int]] = None
+    ) -> Tuple[int, Dict[str, int]]:
+        """
+        Export chat sessions to a JSON Lines file, one session per line
+        
+        Args:
+            workspace_data: Workspace data containing sessions
+            output_path: Path to output file
+            exported: Message counts by session key already in the file from an earlier
+                export. When given, the file is appended to with only new sessions and
+                sessions that gained messages; a later line for the same session
+                supersedes the earlier one. When None, the file is rewritten with
+                every session.
+        
+        Returns:
+            The number of sessions written, and the message counts by session key
+            now in the file. The key is the file the session was parsed from, or
+            its type and session_id for sessions not read from a file.
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        append = exported is not None
+        mode = 'ab' if append else 'wb'
+        exported = dict(exported or {})
+        written = 0
+        
+        with open(output_path, mode, buffering=WRITE_BUFFER_SIZE) as f:
+            for session in workspace_data.chat_sessions:
+                message_count = len(session.messages)
+                key = _jsonl_session_key(session)
+                if append and key is not None and exported.get(key) == message_count:
+                    continue
+                
+                f.write(dumps(session.to_dict(), default=self._json_serializer) + b'\n')
+                written += 1
+                if key is not None:
+                    exported[key] = message_count
+        
+        return written, exported
+    
+    def _encode(self, value: Any, level: int) -> bytes:
+        """Encode a value as indented JSON nested at the given depth"""
+        return indent_block(dumps(value, indent=True, default=self._json_serializer), level)
+    
+    def _encode_field(self, key: str, value: Any, level: int) -> bytes:
+        """Encode an indented '"key": value' object member at the given depth"""
+        return b'  ' * level + dumps(key) + b': ' + self._encode(value, level)
     
     def _json_serializer(self, obj):
         """Custom JSON serializer for objects that aren't JSON serializable by default"""
@@ -34,7 +168,24 @@ class JSONExporter:
             return obj.to_dict()
         elif hasattr(obj, 'isoformat'):  # datetime objects
             return obj.isoformat()
+        elif is_dataclass(obj) and not isinstance(obj, type):  # Dataclasses, which may use __slots__
+            return asdict(obj)
         elif hasattr(obj, '__dict__'):  # Generic objects
             return obj.__dict__
         else:
             return str(obj)
+
+
+def _jsonl_session_key(session: ChatSession) -> Optional[str]:
+    """
+    Identify a session across JSON Lines exports, or None if it cannot be told apart
+    
+    session_ids alone are not unique: chat and editing sessions can share one,
+    and editing sessions without a sessionId all get ''.
+    """
+    source_file = session.metadata.get('source_file')
+    if source_file:
+        return source_file
+    if session.session_id:
+        return f"{session.metadata.get('type', '')}:{session.session_id}"
+    return None
@@ -5,98 +5,131 @@ Simplified version without complex configuration.
 """
 
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, BinaryIO, Dict, Iterable, Iterator
 from datetime import datetime
 
+from .json import WRITE_BUFFER_SIZE
+
+# Lines are encoded and written in batches of roughly this many characters
+WRITE_BATCH_CHARS = 256 * 1024
+
+# Templates for the repeated blocks; each renders several lines, ending with a blank one
+_HEADER_TEMPLATE = "# GitHub Copilot Chat History\n\n**Export Date:** {export_date}\n"
+_SESSION_TEMPLATE = (
+    "### Session {index}: {session_id}\n"
+    "\n"
+    "- **Agent:** {agent}\n"
+    "- **Timestamp:** {timestamp}\n"
+    "- **Messages:** {message_count}\n"
+)
+_MESSAGE_TEMPLATE = "#### Message {index} ({role})\n\n```\n{content}\n```\n"
+_MATCH_TEMPLATE = (
+    "### Match {index}\n"
+    "\n"
+    "- **Session:** {session_id}\n"
+    "- **Role:** {role}\n"
+    "\n"
+    "**Context:**\n"
+    "\n"
+    "```\n"
+    "{context}\n"
+    "```\n"
+)
+
 
 class MarkdownExporter:
     """Simple Markdown exporter for chat data"""
     
     def export_chat_data(self, data: Dict[str, Any], output_path: Path) -> None:
         """Export chat data to Markdown file"""
-        sections = []
-        
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            self._write_lines(f, self._render(data))
+    
+    def _render(self, data: Dict[str, Any]) -> Iterator[str]:
+        """Generate the document's lines and rendered blocks in order, without collecting them"""
         # Header
-        sections.append("# GitHub Copilot Chat History")
-        sections.append("")
-        sections.append(f"**Export Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        sections.append("")
+        yield _HEADER_TEMPLATE.format(export_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
         
         # Statistics
         stats = data.get("statistics", {})
         if stats:
-            sections.append("## Summary")
-            sections.append("")
-            sections.append(f"- **Total Sessions:** {stats.get('total_sessions', 0)}")
-            sections.append(f"- **Total Messages:** {stats.get('total_messages', 0)}")
+            yield "## Summary"
+            yield ""
+            yield f"- **Total Sessions:** {stats.get('total_sessions', 0)}"
+            yield f"- **Total Messages:** {stats.get('total_messages', 0)}"
             
             if stats.get("date_range", {}).get("earliest"):
-                sections.append(f"- **Date Range:** {stats['date_range']['earliest']} to {stats['date_range']['latest']}")
+                yield f"- **Date Range:** {stats['date_range']['earliest']} to {stats['date_range']['latest']}"
             
-            sections.append("")
+            yield ""
         
         # Chat data
         chat_data = data.get("chat_data", {})
         if chat_data and chat_data.get("chat_sessions"):
-            sections.append("## Chat Sessions")
-            sections.append("")
+            yield "## Chat Sessions"
+            yield ""
             
             for i, session in enumerate(chat_data["chat_sessions"], 1):
                 if i > 10:  # Limit to first 10 sessions to avoid huge files
-                    sections.append(f"... and {len(chat_data['chat_sessions']) - 10} more sessions")
+                    yield f"... and {len(chat_data['chat_sessions']) - 10} more sessions"
                     break
                     
-                sessions_id = session.get('session_id', 'Unknown')[:8]  # Truncate for readability
-                sections.append(f"### Session {i}: {sessions_id}")
-                sections.append("")
-                sections.append(f"- **Agent:** {session.get('agent', 'Unknown')}")
-                sections.append(f"- **Timestamp:** {session.get('timestamp', 'Unknown')}")
-                sections.append(f"- **Messages:** {len(session.get('messages', []))}")
-                sections.append("")
+                messages = session.get("messages", [])
+                yield _SESSION_TEMPLATE.format(
+                    index=i,
+                    session_id=session.get('session_id', 'Unknown')[:8],  # Truncate for readability
+                    agent=session.get('agent', 'Unknown'),
+                    timestamp=session.get('timestamp', 'Unknown'),
+                    message_count=len(messages)
+                )
                 
                 # Messages (limit to first few)
-                messages = session.get("messages", [])
                 for j, msg in enumerate(messages[:3], 1):  # Show first 3 messages
-                    role = msg.get('role', 'Unknown').title()
-                    sections.append(f"#### Message {j} ({role})")
-                    sections.append("")
                     content = msg.get('content', '')
                     if len(content) > 500:
                         content = content[:500] + "... [TRUNCATED]"
-                    sections.append(f"```")
-                    sections.append(content)
-                    sections.append(f"```")
-                    sections.append("")
+                    yield _MESSAGE_TEMPLATE.format(
+                        index=j,
+                        role=msg.get('role', 'Unknown').title(),
+                        content=content
+                    )
                 
                 if len(messages) > 3:
-                    sections.append(f"... and {len(messages) - 3} more messages")
-                    sections.append("")
+                    yield f"... and {len(messages) - 3} more messages"
+                    yield ""
         
         # Search results
         search_results = data.get("search_results", [])
         if search_results:
-            sections.append("## Search Results")
-            sections.append("")
+            yield "## Search Results"
+            yield ""
             
             for i, result in enumerate(search_results[:20], 1):  # Limit to 20 results
-                sections.append(f"### Match {i}")
-                sections.append("")
-                sections.append(f"- **Session:** {result.get('session_id', 'Unknown')[:8]}")
-                sections.append(f"- **Role:** {result.get('role', 'Unknown')}")
-                sections.append("")
-                sections.append("**Context:**")
-                sections.append("")
-                sections.append(f"```")
-                sections.append(result.get('context', ''))
-                sections.append(f"```")
-                sections.append("")
+                yield _MATCH_TEMPLATE.format(
+                    index=i,
+                    session_id=result.get('session_id', 'Unknown')[:8],
+                    role=result.get('role', 'Unknown'),
+                    context=result.get('context', '')
+                )
             
             if len(search_results) > 20:
-                sections.append(f"... and {len(search_results) - 20} more matches")
+                yield f"... and {len(search_results) - 20} more matches"
+    
+    def _write_lines(self, f: BinaryIO, lines: Iterable[str]) -> None:
+        """Write newline-separated lines (or rendered blocks) as UTF-8 in batches instead of one huge string"""
+        batch = []
+        batch_chars = 0
+        separator = b""
         
-        markdown_content = "\n".join(sections)
+        for line in lines:
+            batch.append(line)
+            batch_chars += len(line) + 1
+            if batch_chars >= WRITE_BATCH_CHARS:
+                f.write(separator + "\n".join(batch).encode('utf-8'))
+                separator = b"\n"
+                batch = []
+                batch_chars = 0
         
-        # Write to file
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
+        if batch:
+            f.write(separator + "\n".join(batch).encode('utf-8'))
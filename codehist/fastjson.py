@@ -0,0 +1,58 @@
+"""
+JSON encoding and decoding helpers for CodeHist
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. Both paths produce UTF-8 encoded bytes and accept bytes input.
+"""
+
+import json
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "speedups" extra
+    orjson = None
+
+
+def dumps(obj: Any, indent: bool = False, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Serialize obj to UTF-8 JSON bytes, indented by two spaces if requested
+    
+    datetimes are encoded natively in ISO format. Dataclasses are handed to
+    default, like with the stdlib, so both paths honour the models' to_dict().
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except TypeError:
+            # orjson rejects a few things the stdlib accepts, e.g. integers wider than 64 bits
+            pass
+
+    return json.dumps(
+        obj,
+        indent=2 if indent else None,
+        ensure_ascii=False,
+        default=default
+    ).encode('utf-8')
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Deserialize JSON from UTF-8 bytes (or str)"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # The stdlib is more lenient, e.g. with a UTF-8 BOM or NaN literals
+            pass
+    
+    return json.loads(data)
+
+
+def indent_block(blob: bytes, level: int) -> bytes:
+    """Indent every line after the first of an indented JSON blob so it can be nested"""
+    if level <= 0:
+        return blob
+    return blob.replace(b"\n", b"\n" + b"  " * level)
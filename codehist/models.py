@@ -5,13 +5,52 @@ Simplified data structures for representing chat histories
 focused on core chat functionality.
 """
 
+import gc
+from collections import Counter
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from operator import attrgetter
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from pathlib import Path
 
+_get_timestamp = attrgetter('timestamp')
 
-@dataclass
+
+def parse_timestamp(value: str) -> datetime:
+    """
+    Parse a timestamp string, as written by to_dict()
+    
+    ISO 8601 strings from isoformat() go through the C datetime.fromisoformat.
+    Anything else falls back to dateutil's much slower general-purpose parser,
+    which is imported only when first needed to keep startup fast.
+    """
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        from dateutil.parser import parse
+        return parse(value)
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """
+    Pause the cyclic garbage collector while building or serializing many models
+    
+    Sessions, messages and their dicts never form reference cycles, so collections
+    triggered by the allocation count only rescan the growing object graph.
+    Reference counting still frees everything as usual.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+@dataclass(slots=True)
 class Message:
     """Represents a single message in a chat session"""
     role: str  # "user" or "assistant"
@@ -19,6 +58,21 @@ class Message:
     timestamp: datetime
     id: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # The content it was computed from and its lowercased form, for content_lower
+    _lowered: Optional[Tuple[str, str]] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def content_lower(self) -> str:
+        """
+        The content in lower case, computed on first access and cached
+        
+        Case-insensitive searches use it so that repeated queries do not lowercase
+        every message again. The cache is dropped when content is reassigned.
+        """
+        lowered = self._lowered
+        if lowered is None or lowered[0] is not self.content:
+            lowered = self._lowered = (self.content, self.content.lower())
+        return lowered[1]
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
@@ -35,8 +89,7 @@ class Message:
         """Create Message from dictionary data"""
         timestamp = data.get('timestamp')
         if isinstance(timestamp, str):
-            from dateutil.parser import parse
-            timestamp = parse(timestamp)
+            timestamp = parse_timestamp(timestamp)
         elif timestamp is None:
             timestamp = datetime.now()
         
@@ -47,9 +100,22 @@ class Message:
             timestamp=timestamp,
             metadata=data.get('metadata', {})
         )
+    
+    @classmethod
+    def from_dicts(cls, items: List[Dict[str, Any]]) -> List['Message']:
+        """Create Messages from a list of dictionaries, as from_dict() would one by one"""
+        iso = datetime.fromisoformat
+        try:
+            # Fast path for the exact shape to_dict() writes: no defaults, no type checks
+            return [
+                cls(data['role'], data['content'], iso(data['timestamp']), id=data['id'], metadata=data['metadata'])
+                for data in items
+            ]
+        except (KeyError, TypeError, ValueError):
+            return [cls.from_dict(data) for data in items]
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatSession:
     """Represents a chat session with an AI coding agent"""
     agent: str  # e.g., "copilot", "cursor", "windsurf"
@@ -75,12 +141,11 @@ class ChatSession:
         """Create ChatSession from dictionary data"""
         timestamp = data.get('timestamp')
         if isinstance(timestamp, str):
-            from dateutil.parser import parse
-            timestamp = parse(timestamp)
+            timestamp = parse_timestamp(timestamp)
         elif timestamp is None:
             timestamp = datetime.now()
         
-        messages = [Message.from_dict(msg) for msg in data.get('messages', [])]
+        messages = Message.from_dicts(data.get('messages', []))
         
         return cls(
             agent=data.get('agent', 'unknown'),
@@ -92,7 +157,7 @@ class ChatSession:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkspaceData:
     """Represents workspace data from an AI coding agent - simplified for chat focus"""
     agent: str
@@ -100,14 +165,43 @@ class WorkspaceData:
     workspace_path: Optional[str] = None
     chat_sessions: List[ChatSession] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    _stats_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    _stats_key: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Zero-argument super() does not work in slots dataclasses before Python 3.12
+        object.__setattr__(self, name, value)
+        if name == 'chat_sessions':
+            self.invalidate_stats()
+    
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """
+        Statistics about the chat sessions, computed on first access and cached
+        
+        The cache is dropped when chat_sessions is reassigned or changes length.
+        Call invalidate_stats() after editing sessions in place. The returned
+        dict is shared between callers and should be treated as read-only.
+        """
+        if self._stats_cache is None or self._stats_key != len(self.chat_sessions):
+            self._stats_cache = compute_chat_statistics(self.chat_sessions)
+            self._stats_key = len(self.chat_sessions)
+        return self._stats_cache
+    
+    def invalidate_stats(self) -> None:
+        """Drop the cached statistics"""
+        object.__setattr__(self, '_stats_cache', None)
+        object.__setattr__(self, '_stats_key', None)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
+        with gc_paused():
+            chat_sessions = [session.to_dict() for session in self.chat_sessions]
         return {
             'agent': self.agent,
             'version': self.version,
             'workspace_path': self.workspace_path,
-            'chat_sessions': [session.to_dict() for session in self.chat_sessions],
+            'chat_sessions': chat_sessions,
             'metadata': self.metadata
         }
     
@@ -116,7 +210,8 @@ class WorkspaceData:
         """Create WorkspaceData from dictionary data"""
         chat_sessions = []
         if 'chat_sessions' in data:
-            chat_sessions = [ChatSession.from_dict(session_data) for session_data in data['chat_sessions']]
+            with gc_paused():
+                chat_sessions = [ChatSession.from_dict(session_data) for session_data in data['chat_sessions']]
         
         return cls(
             agent=data.get('agent', 'unknown'),
@@ -125,3 +220,70 @@ class WorkspaceData:
             chat_sessions=chat_sessions,
             metadata=data.get('metadata', {})
         )
+
+
+def compute_chat_statistics(chat_sessions: List[ChatSession]) -> Dict[str, Any]:
+    """Compute statistics about a list of chat sessions in a single pass"""
+    session_types: Counter = Counter()
+    message_types: Counter = Counter()
+    agent_activity: Counter = Counter()
+    workspace_activity: Dict[str, Dict[str, Any]] = {}
+    total_messages = 0
+    earliest = latest = None
+    
+    for session in chat_sessions:
+        timestamp = session.timestamp
+        session_types[session.metadata.get('type', 'unknown')] += 1
+        agent_activity[session.agent] += 1
+        
+        # Track workspace activity
+        workspace = session.workspace or "unknown_workspace"
+        workspace_stats = workspace_activity.get(workspace)
+        if workspace_stats is None:
+            workspace_stats = workspace_activity[workspace] = {
+                "sessions": 0,
+                "messages": 0,
+                "first_seen": timestamp,
+                "last_seen": timestamp
+            }
+        else:
+            if timestamp < workspace_stats["first_seen"]:
+                workspace_stats["first_seen"] = timestamp
+            if timestamp > workspace_stats["last_seen"]:
+                workspace_stats["last_seen"] = timestamp
+        
+        messages = session.messages
+        workspace_stats["sessions"] += 1
+        workspace_stats["messages"] += len(messages)
+        total_messages += len(messages)
+        
+        # The overall date range covers session and message timestamps
+        session_earliest = session_latest = timestamp
+        if messages:
+            message_types.update([message.metadata.get('type', message.role) for message in messages])
+            message_timestamps = list(map(_get_timestamp, messages))
+            session_earliest = min(session_earliest, min(message_timestamps))
+            session_latest = max(session_latest, max(message_timestamps))
+        
+        if earliest is None or session_earliest < earliest:
+            earliest = session_earliest
+        if latest is None or session_latest > latest:
+            latest = session_latest
+    
+    # Convert workspace timestamps to ISO format for JSON serialization
+    for workspace_info in workspace_activity.values():
+        workspace_info["first_seen"] = workspace_info["first_seen"].isoformat()
+        workspace_info["last_seen"] = workspace_info["last_seen"].isoformat()
+    
+    return {
+        "total_sessions": len(chat_sessions),
+        "total_messages": total_messages,
+        "message_types": dict(message_types),
+        "session_types": dict(session_types),
+        "workspace_activity": workspace_activity,
+        "date_range": {
+            "earliest": earliest.isoformat() if earliest is not None else None,
+            "latest": latest.isoformat() if latest is not None else None
+        },
+        "agent_activity": dict(agent_activity)
+    }
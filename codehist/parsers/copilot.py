@@ -5,70 +5,228 @@ This module handles parsing GitHub Copilot chat sessions from VS Code's
 JSON storage files to extract actual conversation history.
 """
 
-import json
 import logging
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence, Tuple, Union
 from datetime import datetime
 
-from ..models import ChatSession, Message, WorkspaceData
+from ..fastjson import loads
+from ..models import ChatSession, Message, WorkspaceData, gc_paused
+
+try:
+    import ahocorasick
+except ImportError:  # optional speedup, see the "speedups" extra
+    ahocorasick = None
+
+try:
+    import re2
+except ImportError:  # optional speedup, see the "speedups" extra
+    re2 = None
 
 logger = logging.getLogger(__name__)
 
+# (path, st_mtime_ns, st_size) for every file discovery reads
+StorageFingerprint = Tuple[Tuple[str, int, int], ...]
+
+# Below this many workspaces, starting worker processes costs more than it saves
+MIN_PARALLEL_WORKSPACES = 8
+
+# Default worker count for parallel discovery
+DEFAULT_JOBS = min(8, os.cpu_count() or 1)
+
+# Where VS Code keeps its user data, relative to the home directory. The home
+# directory itself is looked up on each call, since HOME may change at runtime
+if sys.platform == 'win32':
+    _VSCODE_CONFIG_DIR = Path("AppData/Roaming")
+elif sys.platform == 'darwin':
+    _VSCODE_CONFIG_DIR = Path("Library/Application Support")
+else:
+    _VSCODE_CONFIG_DIR = Path(".config")
+
+# User directories of the VS Code editions to read, relative to _VSCODE_CONFIG_DIR
+_VSCODE_USER_DIRS = ("Code/User", "Code - Insiders/User")
+
+
+class _TermMatcher:
+    """Finds occurrences of any of several search terms in a text.
+    
+    Uses a pyahocorasick automaton, which scans the text once regardless of the
+    number of terms, when the package is installed. Otherwise falls back to one
+    C-level ``str.find`` per term.
+    
+    Unless case_sensitive, the terms are looked for in lower case, so the text
+    must be lowercased too. Matches are still reported as the terms given, which
+    must be distinct once lowercased.
+    """
+    
+    def __init__(self, terms: Tuple[str, ...], case_sensitive: bool = True):
+        self.terms = terms
+        self._needles = terms if case_sensitive else tuple(term.lower() for term in terms)
+        self._automaton = None
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for index, needle in enumerate(self._needles):
+                automaton.add_word(needle, (index, len(needle)))
+            automaton.make_automaton()
+            self._automaton = automaton
+    
+    def search(self, text: str) -> Tuple[int, int, List[str]]:
+        """Return the position and length of the earliest match (-1 if none) and the matched terms."""
+        first_pos, first_len = -1, 0
+        found = set()
+        
+        if self._automaton is not None:
+            for end_index, (index, length) in self._automaton.iter(text):
+                start = end_index - length + 1
+                if first_pos == -1 or start < first_pos:
+                    first_pos, first_len = start, length
+                found.add(index)
+        else:
+            for index, needle in enumerate(self._needles):
+                pos = text.find(needle)
+                if pos != -1:
+                    found.add(index)
+                    if first_pos == -1 or pos < first_pos:
+                        first_pos, first_len = pos, len(needle)
+        
+        return first_pos, first_len, [term for index, term in enumerate(self.terms) if index in found]
+
+
+class _RegexAlternation:
+    """Searches for the earliest match of any of several separately compiled regexes.
+    
+    Used when the patterns cannot be joined into one alternation. On a tie the
+    earlier pattern wins, as it would in an alternation.
+    """
+    
+    def __init__(self, regexes: List[Any]):
+        self.regexes = regexes
+    
+    def search(self, text: str) -> Any:
+        """Return the match starting earliest in text, or None."""
+        first = None
+        for regex in self.regexes:
+            match = regex.search(text)
+            if match is not None and (first is None or match.start() < first.start()):
+                first = match
+        return first
+
+
+def _compile_regex(patterns: Tuple[str, ...], case_sensitive: bool) -> Any:
+    """Compile one or more regular expressions into a single alternation.
+    
+    Uses google-re2, whose linear-time matching does not degrade on hostile
+    patterns, when it is installed. Patterns using features RE2 does not support
+    (such as backreferences) fall back to the standard library ``re`` module,
+    which only accepts inline flags like ``(?s)`` at the start of the whole
+    expression, so such patterns are compiled one by one instead.
+    """
+    if len(patterns) == 1:
+        pattern = patterns[0]
+    else:
+        pattern = "|".join(f"(?:{p})" for p in patterns)
+    
+    if re2 is not None:
+        try:
+            # RE2 accepts flag groups anywhere in the expression
+            return re2.compile(pattern if case_sensitive else "(?i)" + pattern)
+        except Exception:
+            pass
+    
+    flags = 0 if case_sensitive else re.IGNORECASE
+    try:
+        return re.compile(pattern, flags)
+    except re.error:
+        if len(patterns) == 1:
+            raise
+    return _RegexAlternation([re.compile(p, flags) for p in patterns])
+
 
 class CopilotParser:
     """Parser for GitHub Copilot chat sessions from VS Code storage."""
     
     def __init__(self):
         self.logger = logger
+        self._matcher_cache: Dict[Tuple[Tuple[str, ...], bool], _TermMatcher] = {}
+        self._regex_cache: Dict[Tuple[Tuple[str, ...], bool], Any] = {}
     
-    def _build_workspace_mapping(self, base_path: Path) -> Dict[str, str]:
-        """Build mapping from workspace storage directory to actual workspace path"""
-        workspace_mapping = {}
+    def _read_workspace_folder(self, workspace_dir: Path) -> Optional[str]:
+        """Read the workspace path a workspace storage directory belongs to from its workspace.json"""
+        workspace_json = workspace_dir / "workspace.json"
+        if not workspace_json.exists():
+            return None
         
         try:
-            workspace_storage_path = base_path / "workspaceStorage"
-            if not workspace_storage_path.exists():
-                return workspace_mapping
+            workspace_data = loads(workspace_json.read_bytes())
+        except Exception as e:
+            self.logger.debug(f"Failed to read workspace.json from {workspace_json}: {e}")
+            return None
+        
+        folder_uri = workspace_data.get('folder', '')
+        if folder_uri.startswith('file://'):
+            folder_path = folder_uri[7:]  # Remove file:// prefix
             
-            # Iterate through each workspace storage directory
-            for workspace_dir in workspace_storage_path.iterdir():
-                if workspace_dir.is_dir():
-                    workspace_json = workspace_dir / "workspace.json"
-                    if workspace_json.exists():
-                        try:
-                            with open(workspace_json, 'r', encoding='utf-8') as f:
-                                workspace_data = json.load(f)
-                            
-                            folder_uri = workspace_data.get('folder', '')
-                            if folder_uri.startswith('file://'):
-                                folder_path = folder_uri[7:]  # Remove file:// prefix
-                                
-                                # Use the full path as the workspace identifier
-                                # This provides complete context and eliminates any possibility of collisions
-                                workspace_mapping[workspace_dir.name] = folder_path
-                                self.logger.debug(f"Mapped workspace {workspace_dir.name} -> {folder_path}")
-                            
-                            # Handle workspace files that reference other workspace files
-                            elif workspace_data.get('workspace'):
-                                # This is a multi-root workspace, use a simplified identifier
-                                workspace_ref = workspace_data.get('workspace', '')
-                                workspace_mapping[workspace_dir.name] = f"multi-root: {workspace_ref}"
-                                self.logger.debug(f"Mapped workspace {workspace_dir.name} -> multi-root: {workspace_ref}")
-                        
-                        except Exception as e:
-                            self.logger.debug(f"Failed to read workspace.json from {workspace_json}: {e}")
+            # Use the full path as the workspace identifier
+            # This provides complete context and eliminates any possibility of collisions
+            self.logger.debug(f"Mapped workspace {workspace_dir.name} -> {folder_path}")
+            return folder_path
         
-        except Exception as e:
-            self.logger.error(f"Error building workspace mapping: {e}")
+        # Handle workspace files that reference other workspace files
+        if workspace_data.get('workspace'):
+            # This is a multi-root workspace, use a simplified identifier
+            workspace_ref = workspace_data.get('workspace', '')
+            self.logger.debug(f"Mapped workspace {workspace_dir.name} -> multi-root: {workspace_ref}")
+            return f"multi-root: {workspace_ref}"
+        
+        return None
+    
+    def _list_workspace_dirs(self, base_path: Path) -> List[Path]:
+        """List the per-workspace storage directories of a VS Code user directory, skipping hidden ones"""
+        workspace_storage_path = base_path / "workspaceStorage"
+        try:
+            with os.scandir(workspace_storage_path) as entries:
+                return [
+                    workspace_storage_path / entry.name for entry in entries
+                    if entry.is_dir() and not entry.name.startswith(".")
+                ]
+        except OSError:
+            return []
+    
+    def _list_session_files(self, workspace_dir: Path) -> Tuple[List[str], List[str]]:
+        """
+        List the paths of the chat session and chat editing session files of a workspace
         
-        return workspace_mapping
+        Finds chatSessions/*.json and chatEditingSessions/*/state.json, skipping
+        hidden names as glob does, with one listing per directory. Paths are joined
+        as strings, which is much cheaper than building Path objects.
+        """
+        chat_dir = os.path.join(workspace_dir, "chatSessions")
+        chat_files = [
+            os.path.join(chat_dir, name) for name in _list_dir(chat_dir)
+            if name.endswith(".json") and not name.startswith(".")
+        ]
         
+        editing_dir = os.path.join(workspace_dir, "chatEditingSessions")
+        editing_files = []
+        for name in _list_dir(editing_dir):
+            if name.startswith("."):
+                continue
+            state_file = os.path.join(editing_dir, name, "state.json")
+            if os.path.exists(state_file):
+                editing_files.append(state_file)
+        
+        return chat_files, editing_files
+    
     def parse_chat_session(self, file_path: Path) -> Optional[ChatSession]:
         """Parse actual chat session from JSON file."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = loads(file_path.read_bytes())
             
             session_id = data.get('sessionId', file_path.stem)
             
@@ -76,63 +234,65 @@ class CopilotParser:
             creation_date = data.get('creationDate')
             last_message_date = data.get('lastMessageDate')
             
+            timestamp = None
             if creation_date:
                 try:
-                    timestamp = datetime.fromisoformat(creation_date.replace('Z', '+00:00'))
+                    timestamp = _parse_creation_date(creation_date)
                 except:
-                    timestamp = datetime.fromtimestamp(file_path.stat().st_mtime)
-            else:
+                    pass
+            if timestamp is None:
                 timestamp = datetime.fromtimestamp(file_path.stat().st_mtime)
             
             # Extract messages from requests
+            requests = data.get('requests', [])
             messages = []
-            for request in data.get('requests', []):
+            for request in requests:
+                get = request.get
+                
                 # User message
-                user_message_text = request.get('message', {}).get('text', '')
+                user_message_text = get('message', {}).get('text', '')
                 if user_message_text:
                     user_message = Message(
                         role="user",
                         content=user_message_text,
                         timestamp=timestamp,
-                        id=request.get('requestId'),
+                        id=get('requestId'),
                         metadata={
                             'type': 'user_request',
-                            'agent': request.get('agent', {}),
-                            'variableData': request.get('variableData', {}),
-                            'modelId': request.get('modelId')
+                            'agent': get('agent', {}),
+                            'variableData': get('variableData', {}),
+                            'modelId': get('modelId')
                         }
                     )
                     messages.append(user_message)
                 
                 # Assistant response
-                response = request.get('response')
+                response = get('response')
                 if response:
-                    # Handle different response formats
-                    response_text = ""
-                    if isinstance(response, dict):
-                        if 'value' in response:
-                            response_text = response['value']
-                        elif 'text' in response:
-                            response_text = response['text']
-                        elif 'content' in response:
-                            response_text = response['content']
-                    elif isinstance(response, str):
+                    # Handle different response formats; the first of these keys present wins
+                    response_type = type(response)
+                    if response_type is dict:
+                        response_get = response.get
+                        response_text = response_get('value', response_get('text', response_get('content', "")))
+                    elif response_type is str:
                         response_text = response
+                    else:
+                        response_text = ""
                     
                     if response_text:
                         assistant_message = Message(
                             role="assistant",
                             content=response_text,
                             timestamp=timestamp,
-                            id=request.get('responseId'),
+                            id=get('responseId'),
                             metadata={
                                 'type': 'assistant_response',
-                                'result': request.get('result', {}),
-                                'followups': request.get('followups', []),
-                                'isCanceled': request.get('isCanceled', False),
-                                'contentReferences': request.get('contentReferences', []),
-                                'codeCitations': request.get('codeCitations', []),
-                                'requestTimestamp': request.get('timestamp')
+                                'result': get('result', {}),
+                                'followups': get('followups', []),
+                                'isCanceled': get('isCanceled', False),
+                                'contentReferences': get('contentReferences', []),
+                                'codeCitations': get('codeCitations', []),
+                                'requestTimestamp': get('timestamp')
                             }
                         )
                         messages.append(assistant_message)
@@ -148,7 +308,7 @@ class CopilotParser:
                 'customTitle': data.get('customTitle'),
                 'type': 'chat_session',
                 'source_file': str(file_path),
-                'total_requests': len(data.get('requests', []))
+                'total_requests': len(requests)
             }
             
             # Workspace will be set by the caller using workspace mapping
@@ -172,8 +332,7 @@ class CopilotParser:
     def parse_chat_editing_session(self, file_path: Path) -> Optional[ChatSession]:
         """Parse chat editing session from state.json file (legacy format)."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = loads(file_path.read_bytes())
             
             session_id = data.get('sessionId', '')
             timestamp = datetime.fromtimestamp(file_path.stat().st_mtime)
@@ -246,30 +405,45 @@ class CopilotParser:
             self.logger.error(f"Error parsing chat editing session {file_path}: {e}")
             return None
     
-    def discover_vscode_copilot_data(self) -> WorkspaceData:
-        """Discover Copilot data from VS Code's application support directory."""
-        import os
+    def get_vscode_user_paths(self) -> List[Path]:
+        """Get the candidate VS Code user data directories (including Insiders)."""
+        base_home = Path.home() / _VSCODE_CONFIG_DIR
+        return [base_home / user_dir for user_dir in _VSCODE_USER_DIRS]
+    
+    def get_storage_fingerprint(self) -> StorageFingerprint:
+        """Build a cache key describing the current state of all Copilot session files.
+        
+        Each entry is a ``(path, st_mtime_ns, st_size)`` tuple. Session files are
+        stat'ed individually because VS Code rewrites them in place, which does not
+        touch the mtime of the containing directory.
+        """
+        entries = []
+        for base_path in self.get_vscode_user_paths():
+            for workspace_dir in self._list_workspace_dirs(base_path):
+                chat_files, editing_files = self._list_session_files(workspace_dir)
+                for file_path in (*chat_files, *editing_files, os.path.join(workspace_dir, "workspace.json")):
+                    try:
+                        st = os.stat(file_path)
+                    except OSError:
+                        continue
+                    entries.append((file_path, st.st_mtime_ns, st.st_size))
+        return tuple(sorted(entries))
+    
+    def discover_vscode_copilot_data_cached(self, fingerprint: Optional[StorageFingerprint] = None,
+                                            jobs: int = 1) -> WorkspaceData:
+        """Discover Copilot data, reusing the result from earlier calls in this process.
         
-        # Get VS Code storage paths (including Insiders)
-        vscode_paths = []
-        if os.name == 'nt':  # Windows
-            base_home = Path.home() / "AppData/Roaming"
-            vscode_paths = [
-                base_home / "Code/User",
-                base_home / "Code - Insiders/User"
-            ]
-        elif os.uname().sysname == 'Darwin':  # macOS
-            base_home = Path.home() / "Library/Application Support"
-            vscode_paths = [
-                base_home / "Code/User",
-                base_home / "Code - Insiders/User"
-            ]
-        else:  # Linux
-            base_home = Path.home() / ".config"
-            vscode_paths = [
-                base_home / "Code/User",
-                base_home / "Code - Insiders/User"
-            ]
+        The result is memoized on the storage fingerprint, so it is re-parsed as soon
+        as any session file changes. The returned object is shared between callers
+        and must not be modified.
+        """
+        if fingerprint is None:
+            fingerprint = self.get_storage_fingerprint()
+        return _discover_cached(fingerprint, jobs)
+    
+    def discover_vscode_copilot_data(self, jobs: int = 1) -> WorkspaceData:
+        """Discover Copilot data from VS Code's application support directory."""
+        vscode_paths = self.get_vscode_user_paths()
         
         # Collect all data from all VS Code installations
         all_data = WorkspaceData(agent="GitHub Copilot")
@@ -277,7 +451,7 @@ class CopilotParser:
         for base_path in vscode_paths:
             if base_path.exists():
                 self.logger.info(f"Discovering Copilot data from: {base_path}")
-                data = self.discover_copilot_data(base_path)
+                data = self.discover_copilot_data(base_path, jobs=jobs)
                 if data.chat_sessions:
                     # Merge the data
                     all_data.chat_sessions.extend(data.chat_sessions)
@@ -299,134 +473,213 @@ class CopilotParser:
         
         return all_data
     
-    def discover_copilot_data(self, base_path: Path) -> WorkspaceData:
-        """Discover and parse all Copilot data in a directory."""
-        workspace_data = WorkspaceData(
-            agent="GitHub Copilot",
-            workspace_path=str(base_path),
-            metadata={'discovery_source': str(base_path)}
-        )
+    def parse_workspace_dir(self, workspace_dir: Path) -> Tuple[List[ChatSession], List[ChatSession]]:
+        """
+        Parse all sessions stored for a single workspace
         
-        # Build workspace mapping from workspace.json files
-        workspace_mapping = self._build_workspace_mapping(base_path)
-        self.logger.info(f"Built workspace mapping with {len(workspace_mapping)} workspaces")
+        Returns the chat sessions and the chat editing sessions separately, both
+        with their workspace already resolved from workspace.json.
+        """
+        workspace = self._read_workspace_folder(workspace_dir)
+        chat_files, editing_files = self._list_session_files(workspace_dir)
         
         # Look for actual chat session JSON files (new format)
-        chat_session_pattern = "workspaceStorage/*/chatSessions/*.json"
-        for session_file in base_path.glob(chat_session_pattern):
-            session = self.parse_chat_session(session_file)
+        chat_sessions = []
+        for session_file in chat_files:
+            session = self.parse_chat_session(Path(session_file))
             if session:
-                # Extract workspace from file path using mapping
-                workspace_id = session_file.parts[-3]  # workspaceStorage/{workspace_id}/chatSessions/...
-                if workspace_id in workspace_mapping:
-                    session.workspace = workspace_mapping[workspace_id]
-                workspace_data.chat_sessions.append(session)
+                session.workspace = workspace
+                chat_sessions.append(session)
         
         # Look for chat editing session files (legacy format)
-        editing_session_pattern = "workspaceStorage/*/chatEditingSessions/*/state.json"
-        for session_file in base_path.glob(editing_session_pattern):
-            session = self.parse_chat_editing_session(session_file)
+        editing_sessions = []
+        for session_file in editing_files:
+            session = self.parse_chat_editing_session(Path(session_file))
             if session:
-                # Extract workspace from file path using mapping
-                workspace_id = session_file.parts[-4]  # workspaceStorage/{workspace_id}/chatEditingSessions/...
-                if workspace_id in workspace_mapping:
-                    session.workspace = workspace_mapping[workspace_id]
-                workspace_data.chat_sessions.append(session)
+                session.workspace = workspace
+                editing_sessions.append(session)
+        
+        return chat_sessions, editing_sessions
+    
+    def discover_copilot_data(self, base_path: Path, jobs: int = 1) -> WorkspaceData:
+        """
+        Discover and parse all Copilot data in a directory
+        
+        Args:
+            base_path: VS Code user directory containing workspaceStorage
+            jobs: Number of worker processes used to parse workspaces in parallel
+        """
+        workspace_data = WorkspaceData(
+            agent="GitHub Copilot",
+            workspace_path=str(base_path),
+            metadata={'discovery_source': str(base_path)}
+        )
+        
+        workspace_dirs = self._list_workspace_dirs(base_path)
+        self.logger.info(f"Found {len(workspace_dirs)} workspace storage directories")
+        
+        with gc_paused():
+            results = None
+            if jobs > 1 and len(workspace_dirs) >= MIN_PARALLEL_WORKSPACES:
+                try:
+                    with ProcessPoolExecutor(max_workers=jobs) as executor:
+                        results = list(executor.map(_parse_workspace_dir, workspace_dirs, chunksize=4))
+                except (OSError, BrokenProcessPool) as e:
+                    self.logger.warning(f"Parallel parsing failed, falling back to a single process: {e}")
+            
+            if results is None:
+                results = [self.parse_workspace_dir(workspace_dir) for workspace_dir in workspace_dirs]
+            
+            # Keep chat sessions ahead of editing sessions, as a plain glob over both patterns would
+            for chat_sessions, _ in results:
+                workspace_data.chat_sessions.extend(chat_sessions)
+            for _, editing_sessions in results:
+                workspace_data.chat_sessions.extend(editing_sessions)
         
         self.logger.info(f"Discovered {len(workspace_data.chat_sessions)} chat sessions from {base_path}")
         return workspace_data
     
-    def search_chat_content(self, workspace_data: WorkspaceData, query: str, 
-                           case_sensitive: bool = False) -> List[Dict[str, Any]]:
-        """Search for content in chat sessions."""
+    def _get_term_matcher(self, terms: Tuple[str, ...], case_sensitive: bool) -> "_TermMatcher":
+        """Get a multi-term matcher, reusing the one built for an identical earlier query."""
+        key = (terms, case_sensitive)
+        matcher = self._matcher_cache.get(key)
+        if matcher is None:
+            matcher = _TermMatcher(terms, case_sensitive)
+            self._matcher_cache[key] = matcher
+        return matcher
+    
+    def _get_regex(self, patterns: Tuple[str, ...], case_sensitive: bool) -> Any:
+        """Get a compiled regex, reusing the one built for an identical earlier query."""
+        key = (patterns, case_sensitive)
+        regex = self._regex_cache.get(key)
+        if regex is None:
+            regex = _compile_regex(patterns, case_sensitive)
+            self._regex_cache[key] = regex
+        return regex
+    
+    def search_chat_content(self, workspace_data: WorkspaceData, query: Union[str, Sequence[str]], 
+                           case_sensitive: bool = False, regex: bool = False) -> List[Dict[str, Any]]:
+        """Search for content in chat sessions.
+        
+        A string query is matched as a single phrase. A sequence of terms matches
+        messages containing any of them, scanning each message only once. With
+        regex=True the query (or each term) is a regular expression instead.
+        """
         results = []
-        search_query = query if case_sensitive else query.lower()
+        if isinstance(query, str):
+            terms = (query,)
+        else:
+            terms = tuple(dict.fromkeys(term for term in query if term))
+        
+        if regex:
+            return self._search_regex(workspace_data, terms, case_sensitive)
+        if not case_sensitive:
+            # Terms differing only in case find the same matches; keep the first spelling
+            folded: Dict[str, str] = {}
+            for term in terms:
+                folded.setdefault(term.lower(), term)
+            terms = tuple(folded.values())
+        
+        matcher = self._get_term_matcher(terms, case_sensitive) if len(terms) > 1 else None
+        search_query = terms[0] if terms else ""
+        if not case_sensitive:
+            search_query = search_query.lower()
         
         for session in workspace_data.chat_sessions:
             for message in session.messages:
-                content = message.content if case_sensitive else message.content.lower()
+                content = message.content if case_sensitive else message.content_lower
                 
-                if search_query in content:
-                    # Find context around the match
+                matched_terms = None
+                if matcher is None:
                     match_pos = content.find(search_query)
-                    context_start = max(0, match_pos - 100)
-                    context_end = min(len(content), match_pos + len(search_query) + 100)
-                    context = content[context_start:context_end]
-                    
-                    results.append({
-                        "session_id": session.session_id,
-                        "message_id": message.id,
-                        "role": message.role,
-                        "timestamp": message.timestamp.isoformat(),
-                        "match_position": match_pos,
-                        "context": context,
-                        "full_content": message.content,
-                        "metadata": message.metadata
-                    })
+                    match_len = len(search_query)
+                else:
+                    match_pos, match_len, matched_terms = matcher.search(content)
+                
+                if match_pos == -1:
+                    continue
+                
+                # Find context around the match
+                context_start = max(0, match_pos - 100)
+                context_end = min(len(content), match_pos + match_len + 100)
+                context = content[context_start:context_end]
+                
+                result = {
+                    "session_id": session.session_id,
+                    "message_id": message.id,
+                    "role": message.role,
+                    "timestamp": message.timestamp.isoformat(),
+                    "match_position": match_pos,
+                    "context": context,
+                    "full_content": message.content,
+                    "metadata": message.metadata
+                }
+                if matched_terms is not None:
+                    result["matched_terms"] = matched_terms
+                results.append(result)
         
         return results
     
-    def get_chat_statistics(self, workspace_data: WorkspaceData) -> Dict[str, Any]:
-        """Get statistics about chat sessions."""
-        stats = {
-            "total_sessions": len(workspace_data.chat_sessions),
-            "total_messages": 0,
-            "message_types": {},
-            "session_types": {},
-            "workspace_activity": {},
-            "date_range": {
-                "earliest": None,
-                "latest": None
-            },
-            "agent_activity": {}
-        }
+    def _search_regex(self, workspace_data: WorkspaceData, patterns: Tuple[str, ...],
+                      case_sensitive: bool) -> List[Dict[str, Any]]:
+        """Search chat sessions for the first match of any of the given patterns."""
+        results = []
+        if not patterns:
+            return results
         
-        all_timestamps = []
+        compiled = self._get_regex(patterns, case_sensitive)
+        search = compiled.search
         
         for session in workspace_data.chat_sessions:
-            session_type = session.metadata.get('type', 'unknown')
-            stats["session_types"][session_type] = stats["session_types"].get(session_type, 0) + 1
-            
-            all_timestamps.append(session.timestamp)
-            
-            agent = session.agent
-            stats["agent_activity"][agent] = stats["agent_activity"].get(agent, 0) + 1
-            
-            # Track workspace activity
-            workspace = session.workspace or "unknown_workspace"
-            if workspace not in stats["workspace_activity"]:
-                stats["workspace_activity"][workspace] = {
-                    "sessions": 0,
-                    "messages": 0,
-                    "first_seen": session.timestamp,
-                    "last_seen": session.timestamp
-                }
-            
-            workspace_stats = stats["workspace_activity"][workspace]
-            workspace_stats["sessions"] += 1
-            
-            # Update workspace date range
-            if session.timestamp < workspace_stats["first_seen"]:
-                workspace_stats["first_seen"] = session.timestamp
-            if session.timestamp > workspace_stats["last_seen"]:
-                workspace_stats["last_seen"] = session.timestamp
-            
             for message in session.messages:
-                stats["total_messages"] += 1
-                workspace_stats["messages"] += 1
+                content = message.content
+                match = search(content)
+                if match is None:
+                    continue
                 
-                message_type = message.metadata.get('type', message.role)
-                stats["message_types"][message_type] = stats["message_types"].get(message_type, 0) + 1
+                match_pos, match_end = match.start(), match.end()
+                context_start = max(0, match_pos - 100)
+                context_end = min(len(content), match_end + 100)
                 
-                all_timestamps.append(message.timestamp)
-        
-        # Convert workspace timestamps to ISO format for JSON serialization
-        for workspace_info in stats["workspace_activity"].values():
-            workspace_info["first_seen"] = workspace_info["first_seen"].isoformat()
-            workspace_info["last_seen"] = workspace_info["last_seen"].isoformat()
+                results.append({
+                    "session_id": session.session_id,
+                    "message_id": message.id,
+                    "role": message.role,
+                    "timestamp": message.timestamp.isoformat(),
+                    "match_position": match_pos,
+                    "context": content[context_start:context_end],
+                    "full_content": message.content,
+                    "metadata": message.metadata
+                })
         
-        if all_timestamps:
-            stats["date_range"]["earliest"] = min(all_timestamps).isoformat()
-            stats["date_range"]["latest"] = max(all_timestamps).isoformat()
-        
-        return stats
+        return results
+    
+    def get_chat_statistics(self, workspace_data: WorkspaceData) -> Dict[str, Any]:
+        """Get statistics about chat sessions (cached on the WorkspaceData)."""
+        return workspace_data.stats
+
+
+@lru_cache(maxsize=4096)
+def _parse_creation_date(creation_date: str) -> datetime:
+    """Parse a session's ISO 8601 creationDate; sessions started together share the same string."""
+    return datetime.fromisoformat(creation_date.replace('Z', '+00:00'))
+
+
+def _list_dir(path: str) -> List[str]:
+    """List the names in a directory, or none if it does not exist or cannot be read."""
+    try:
+        return os.listdir(path)
+    except OSError:
+        return []
+
+
+def _parse_workspace_dir(workspace_dir: Path) -> Tuple[List[ChatSession], List[ChatSession]]:
+    """Process pool entry point for CopilotParser.parse_workspace_dir."""
+    with gc_paused():
+        return CopilotParser().parse_workspace_dir(workspace_dir)
+
+
+@lru_cache(maxsize=4)
+def _discover_cached(fingerprint: StorageFingerprint, jobs: int = 1) -> WorkspaceData:
+    """Run discovery once per distinct storage fingerprint."""
+    return CopilotParser().discover_vscode_copilot_data(jobs=jobs)
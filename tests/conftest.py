@@ -0,0 +1,57 @@
+"""Shared fixtures for CodeHist tests"""
+
+import json
+
+import pytest
+
+
+def write_chat_session(path, session_id, requests, creation_date=1750000000000):
+    """Write a chatSessions/*.json file in VS Code's on-disk format"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "sessionId": session_id,
+        "creationDate": creation_date,
+        "requests": requests,
+    }), encoding="utf-8")
+
+
+def make_request(request_id, text, response):
+    """Build a single request entry with a user message and assistant response"""
+    return {
+        "requestId": request_id,
+        "message": {"text": text},
+        "response": {"value": response},
+        "modelId": "gpt-4o",
+    }
+
+
+@pytest.fixture
+def vscode_home(tmp_path, monkeypatch):
+    """Fake home directory containing VS Code Copilot storage for two workspaces"""
+    home = tmp_path / "home"
+    cache_home = tmp_path / "cache"
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+
+    storage = home / ".config" / "Code" / "User" / "workspaceStorage"
+    for index, folder in enumerate(["/projects/api", "/projects/web"]):
+        workspace_dir = storage / f"ws{index}"
+        workspace_dir.mkdir(parents=True)
+        (workspace_dir / "workspace.json").write_text(json.dumps({"folder": f"file://{folder}"}))
+        write_chat_session(
+            workspace_dir / "chatSessions" / f"session{index}.json",
+            f"session{index}",
+            [
+                make_request(f"req{index}a", "How do I run docker compose?", "Use `docker compose up`."),
+                make_request(f"req{index}b", "What about error handling?", "Wrap it in try/except."),
+            ],
+        )
+
+    editing_dir = storage / "ws0" / "chatEditingSessions" / "edit0"
+    editing_dir.mkdir(parents=True)
+    (editing_dir / "state.json").write_text(json.dumps({
+        "sessionId": "edit0",
+        "linearHistory": [{"requestId": "edit-req", "workingSet": ["a.py"], "entries": []}],
+    }))
+
+    return home
@@ -0,0 +1,118 @@
+"""Tests for the chat data discovery cache"""
+
+import pickle
+
+from codehist import cache
+from codehist.cache import clear_cache, get_workspace_cache_path, load_workspace_data, save_workspace_data
+from codehist.parsers.copilot import CopilotParser
+
+from .conftest import make_request, write_chat_session
+
+
+class TestDiscoveryCache:
+    """Test on-disk and in-process discovery caching"""
+
+    def test_round_trip(self, vscode_home):
+        """Cached data is returned while the fingerprint matches"""
+        parser = CopilotParser()
+        fingerprint = parser.get_storage_fingerprint()
+        data = parser.discover_vscode_copilot_data()
+
+        save_workspace_data(fingerprint, data)
+        cached = load_workspace_data(fingerprint)
+
+        assert cached is not None
+        assert len(cached.chat_sessions) == len(data.chat_sessions) == 3
+
+    def test_fingerprint_changes_when_session_rewritten(self, vscode_home):
+        """Rewriting a session file in place invalidates the cache"""
+        parser = CopilotParser()
+        fingerprint = parser.get_storage_fingerprint()
+        save_workspace_data(fingerprint, parser.discover_vscode_copilot_data())
+
+        session_file = next(vscode_home.rglob("session0.json"))
+        write_chat_session(session_file, "session0", [make_request("new", "a much longer question", "answer")])
+
+        new_fingerprint = parser.get_storage_fingerprint()
+        assert new_fingerprint != fingerprint
+        assert load_workspace_data(new_fingerprint) is None
+
+    def test_expired_entry_is_ignored(self, vscode_home):
+        """Entries older than the TTL are treated as a miss"""
+        parser = CopilotParser()
+        fingerprint = parser.get_storage_fingerprint()
+        save_workspace_data(fingerprint, parser.discover_vscode_copilot_data())
+
+        assert load_workspace_data(fingerprint, ttl=-1) is None
+
+    def test_entry_for_other_model_fields_is_ignored(self, vscode_home, monkeypatch):
+        """Entries pickled for a different model layout or format version are a miss"""
+        parser = CopilotParser()
+        fingerprint = parser.get_storage_fingerprint()
+        save_workspace_data(fingerprint, parser.discover_vscode_copilot_data())
+        cache_path = get_workspace_cache_path()
+
+        entry = pickle.loads(cache_path.read_bytes())
+        version, message_fields, *other_fields = entry["format"]
+        entry["format"] = (version, tuple(name for name in message_fields if name != "_lowered"), *other_fields)
+        cache_path.write_bytes(pickle.dumps(entry))
+        assert load_workspace_data(fingerprint) is None
+
+        save_workspace_data(fingerprint, parser.discover_vscode_copilot_data())
+        monkeypatch.setattr(cache, "CACHE_FORMAT_VERSION", cache.CACHE_FORMAT_VERSION + 1)
+        assert load_workspace_data(fingerprint) is None
+
+    def test_in_process_cache_reuses_result(self, vscode_home):
+        """Repeated discovery with an unchanged fingerprint returns the same object"""
+        parser = CopilotParser()
+        first = parser.discover_vscode_copilot_data_cached()
+        second = CopilotParser().discover_vscode_copilot_data_cached()
+
+        assert first is second
+
+    def test_clear_cache(self, vscode_home):
+        """Clearing removes the pickle file"""
+        parser = CopilotParser()
+        save_workspace_data(parser.get_storage_fingerprint(), parser.discover_vscode_copilot_data())
+        assert get_workspace_cache_path().exists()
+
+        assert clear_cache() is True
+        assert not get_workspace_cache_path().exists()
+        assert clear_cache() is False
+
+
+class TestStatisticsCache:
+    """Test statistics caching on WorkspaceData"""
+
+    def test_stats_computed_once(self, vscode_home):
+        """Repeated calls return the cached statistics"""
+        parser = CopilotParser()
+        data = parser.discover_vscode_copilot_data()
+
+        stats = parser.get_chat_statistics(data)
+        assert stats["total_sessions"] == 3
+        assert parser.get_chat_statistics(data) is stats
+
+    def test_stats_invalidated_on_session_changes(self, vscode_home):
+        """Reassigning or extending chat_sessions recomputes statistics"""
+        parser = CopilotParser()
+        data = parser.discover_vscode_copilot_data()
+        stats = data.stats
+
+        data.chat_sessions.append(data.chat_sessions[0])
+        assert data.stats["total_sessions"] == 4
+
+        data.chat_sessions = data.chat_sessions[:1]
+        assert data.stats["total_sessions"] == 1
+        assert data.stats is not stats
+
+    def test_stats_survive_disk_cache(self, vscode_home):
+        """Statistics computed before saving are restored with the cached data"""
+        parser = CopilotParser()
+        fingerprint = parser.get_storage_fingerprint()
+        data = parser.discover_vscode_copilot_data()
+        stats = data.stats
+        save_workspace_data(fingerprint, data)
+
+        cached = load_workspace_data(fingerprint)
+        assert cached._stats_cache == stats
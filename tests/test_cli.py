@@ -0,0 +1,72 @@
+"""Tests for the CodeHist CLI"""
+
+from typer.testing import CliRunner
+
+from codehist import models
+from codehist.cli import app
+from codehist.parsers.copilot import CopilotParser
+
+from .conftest import make_request, write_chat_session
+
+runner = CliRunner()
+
+
+class TestCLI:
+    """Test CLI commands against a fake VS Code storage directory"""
+
+    def test_stats(self, vscode_home):
+        """stats lists totals and workspace activity"""
+        result = runner.invoke(app, ["stats", "--no-cache"])
+
+        assert result.exit_code == 0
+        assert "Total Sessions" in result.output
+        assert "/projects/api: 2 sessions" in result.output
+
+    def test_search_escapes_markup_in_content(self, vscode_home):
+        """Chat content that looks like Rich markup is printed literally"""
+        session_file = next(vscode_home.rglob("session1.json"))
+        write_chat_session(session_file, "session1", [make_request("r", "why does [/red] break docker?", "it shouldn't")])
+
+        result = runner.invoke(app, ["search", "docker", "--no-cache"])
+
+        assert result.exit_code == 0
+        assert "[/red]" in result.output
+        assert "Found 3 matches" in result.output
+
+    def test_commands_use_shared_parser(self, vscode_home):
+        """Commands use the parser stored on the context by the app callback"""
+        parser = CopilotParser()
+
+        result = runner.invoke(app, ["search", "--regex", "dock.r", "--no-cache"], obj={"parser": parser})
+
+        assert result.exit_code == 0
+        assert list(parser._regex_cache) == [(("dock.r",), False)]
+
+    def test_jsonl_export_skips_statistics(self, vscode_home, tmp_path, monkeypatch):
+        """Filling the cache and exporting jsonl never compute statistics"""
+        def fail(chat_sessions):
+            raise AssertionError("statistics computed")
+        monkeypatch.setattr(models, "compute_chat_statistics", fail)
+
+        result = runner.invoke(app, ["chat", "-f", "jsonl", "-o", str(tmp_path / "sessions.jsonl")])
+
+        assert result.exit_code == 0, result.output
+
+    def test_jsonl_export_is_incremental(self, vscode_home, tmp_path):
+        """A repeated jsonl export appends nothing until a session changes"""
+        output = tmp_path / "sessions.jsonl"
+
+        assert runner.invoke(app, ["chat", "-f", "jsonl", "-o", str(output)]).exit_code == 0
+        assert len(output.read_bytes().splitlines()) == 3
+        assert runner.invoke(app, ["chat", "-f", "jsonl", "-o", str(output)]).exit_code == 0
+        assert len(output.read_bytes().splitlines()) == 3
+
+        session_file = next(vscode_home.rglob("session1.json"))
+        write_chat_session(session_file, "session1", [make_request("r", "docker again?", "yes")] * 3)
+        assert runner.invoke(app, ["chat", "-f", "jsonl", "-o", str(output)]).exit_code == 0
+        assert len(output.read_bytes().splitlines()) == 4
+
+        # A file changed behind our back is rewritten from scratch
+        output.write_bytes(b"")
+        assert runner.invoke(app, ["chat", "-f", "jsonl", "-o", str(output)]).exit_code == 0
+        assert len(output.read_bytes().splitlines()) == 3
@@ -0,0 +1,183 @@
+"""Tests for CopilotParser discovery and search"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from codehist.parsers import copilot
+from codehist.parsers.copilot import CopilotParser
+
+from .conftest import make_request, write_chat_session
+
+
+@pytest.fixture
+def workspace_data(vscode_home):
+    return CopilotParser().discover_vscode_copilot_data()
+
+
+class TestDiscovery:
+    """Test CopilotParser discovery"""
+
+    def test_discovers_sessions_with_workspaces(self, workspace_data):
+        """Chat sessions come before editing sessions and carry their workspace path"""
+        sessions = workspace_data.chat_sessions
+
+        assert [s.metadata["type"] for s in sessions] == ["chat_session", "chat_session", "chat_editing_session"]
+        assert {s.session_id: s.workspace for s in sessions} == {
+            "session0": "/projects/api",
+            "session1": "/projects/web",
+            "edit0": "/projects/api",
+        }
+
+    def test_parallel_matches_serial(self, vscode_home, monkeypatch):
+        """Parsing workspaces in worker processes gives the same sessions in the same order"""
+        monkeypatch.setattr(copilot, "MIN_PARALLEL_WORKSPACES", 1)
+        parser = CopilotParser()
+
+        serial = parser.discover_vscode_copilot_data(jobs=1)
+        parallel = parser.discover_vscode_copilot_data(jobs=2)
+
+        assert parallel.to_dict() == serial.to_dict()
+
+    def test_hidden_files_are_skipped(self, vscode_home):
+        """Hidden session files and editing session directories are not parsed"""
+        workspace_dir = vscode_home / ".config" / "Code" / "User" / "workspaceStorage" / "ws0"
+        write_chat_session(workspace_dir / "chatSessions" / ".backup.json", "hidden", [make_request("r", "Hi", "Hello")])
+        hidden_editing = workspace_dir / "chatEditingSessions" / ".edit1"
+        hidden_editing.mkdir()
+        (hidden_editing / "state.json").write_text('{"sessionId": "hidden-edit", "linearHistory": []}')
+
+        chat_sessions, editing_sessions = CopilotParser().parse_workspace_dir(workspace_dir)
+
+        assert [s.session_id for s in chat_sessions] == ["session0"]
+        assert [s.session_id for s in editing_sessions] == ["edit0"]
+
+    def test_hidden_workspace_dirs_are_skipped(self, vscode_home):
+        """Hidden workspace storage directories are neither parsed nor fingerprinted"""
+        parser = CopilotParser()
+        fingerprint = parser.get_storage_fingerprint()
+        hidden = vscode_home / ".config" / "Code" / "User" / "workspaceStorage" / ".ws2"
+        write_chat_session(hidden / "chatSessions" / "session2.json", "session2", [make_request("r", "Hi", "Hello")])
+
+        sessions = parser.discover_vscode_copilot_data().chat_sessions
+
+        assert "session2" not in [s.session_id for s in sessions]
+        assert parser.get_storage_fingerprint() == fingerprint
+
+    def test_creation_date_timestamps(self, tmp_path):
+        """ISO creation dates are parsed, anything else falls back to the file's mtime"""
+        parser = CopilotParser()
+        request = [make_request("req", "Hello", "Hi")]
+        write_chat_session(tmp_path / "iso.json", "iso", request, creation_date="2025-06-15T12:00:00Z")
+        write_chat_session(tmp_path / "ms.json", "ms", request)
+
+        iso = parser.parse_chat_session(tmp_path / "iso.json")
+        assert iso.timestamp == datetime(2025, 6, 15, 12, tzinfo=timezone.utc)
+        assert all(message.timestamp is iso.timestamp for message in iso.messages)
+
+        ms = parser.parse_chat_session(tmp_path / "ms.json")
+        assert ms.timestamp == datetime.fromtimestamp((tmp_path / "ms.json").stat().st_mtime)
+
+
+    @pytest.mark.parametrize("response, expected", [
+        ({"value": "from value", "text": "from text"}, "from value"),
+        ({"text": "from text", "content": "from content"}, "from text"),
+        ({"content": "from content"}, "from content"),
+        ({"value": "", "text": "from text"}, None),
+        ("plain string", "plain string"),
+        ([{"value": "a list"}], None),
+    ])
+    def test_response_formats(self, tmp_path, response, expected):
+        """The response text comes from the first of value, text and content present"""
+        request = {"requestId": "req", "message": {"text": "Hello"}, "response": response}
+        write_chat_session(tmp_path / "session.json", "session", [request])
+
+        messages = CopilotParser().parse_chat_session(tmp_path / "session.json").messages
+
+        assert [m.content for m in messages if m.role == "assistant"] == ([expected] if expected else [])
+
+
+class TestSearchChatContent:
+    """Test CopilotParser.search_chat_content"""
+
+    def test_phrase_search(self, workspace_data):
+        """A string query is matched as one phrase"""
+        results = CopilotParser().search_chat_content(workspace_data, "docker compose")
+
+        assert len(results) == 4
+        assert all("matched_terms" not in result for result in results)
+        assert results[0]["match_position"] == results[0]["context"].find("docker compose")
+
+    def test_case_sensitive(self, workspace_data):
+        """Case sensitive search does not fold the query"""
+        parser = CopilotParser()
+
+        assert parser.search_chat_content(workspace_data, "Docker", case_sensitive=True) == []
+        assert len(parser.search_chat_content(workspace_data, "Docker")) == 4
+
+    @pytest.mark.parametrize("use_automaton", [True, False])
+    def test_multi_term_search(self, workspace_data, monkeypatch, use_automaton):
+        """A sequence of terms matches messages containing any of them"""
+        if not use_automaton:
+            monkeypatch.setattr(copilot, "ahocorasick", None)
+        elif copilot.ahocorasick is None:
+            pytest.skip("pyahocorasick is not installed")
+
+        results = CopilotParser().search_chat_content(workspace_data, ["try/except", "compose"])
+
+        assert len(results) == 6
+        by_content = {result["full_content"]: result for result in results}
+        assert by_content["Wrap it in try/except."]["matched_terms"] == ["try/except"]
+        assert by_content["How do I run docker compose?"]["match_position"] == 20
+
+    @pytest.mark.parametrize("use_automaton", [True, False])
+    def test_multi_term_search_reports_terms_as_given(self, workspace_data, monkeypatch, use_automaton):
+        """Case-insensitive matches are reported as the user spelled the term, once per term"""
+        if not use_automaton:
+            monkeypatch.setattr(copilot, "ahocorasick", None)
+        elif copilot.ahocorasick is None:
+            pytest.skip("pyahocorasick is not installed")
+
+        results = CopilotParser().search_chat_content(workspace_data, ["TRY/except", "try/EXCEPT", "Compose"])
+
+        by_content = {result["full_content"]: result for result in results}
+        assert by_content["Wrap it in try/except."]["matched_terms"] == ["TRY/except"]
+        assert by_content["How do I run docker compose?"]["matched_terms"] == ["Compose"]
+
+    def test_matcher_is_reused(self, workspace_data):
+        """Repeating a multi-term query reuses the compiled matcher"""
+        parser = CopilotParser()
+        parser.search_chat_content(workspace_data, ["docker", "error"])
+        matcher = parser._get_term_matcher(("docker", "error"), False)
+        parser.search_chat_content(workspace_data, ["docker", "error"])
+
+        assert parser._get_term_matcher(("docker", "error"), False) is matcher
+
+    def test_regex_search(self, workspace_data):
+        """Regex queries match case-insensitively against the original content"""
+        results = CopilotParser().search_chat_content(workspace_data, r"DOCKER\s+compose", regex=True)
+
+        assert len(results) == 4
+        by_content = {result["full_content"]: result for result in results}
+        assert by_content["How do I run docker compose?"]["match_position"] == 13
+
+    def test_regex_patterns_combined(self, workspace_data, monkeypatch):
+        """Several patterns compile into one alternation, with or without re2"""
+        monkeypatch.setattr(copilot, "re2", None)
+        parser = CopilotParser()
+
+        results = parser.search_chat_content(workspace_data, [r"try/\w+", "compose"], regex=True)
+
+        assert len(results) == 6
+        assert parser._get_regex((r"try/\w+", "compose"), False) is parser._get_regex((r"try/\w+", "compose"), False)
+
+    @pytest.mark.parametrize("patterns", [[r"(?s)DOCKER.compose"], [r"try/\w+", r"(?s)DOCKER.compose"]])
+    def test_regex_inline_flags(self, workspace_data, monkeypatch, patterns):
+        """Patterns with inline flags work alone and alongside others without re2"""
+        monkeypatch.setattr(copilot, "re2", None)
+
+        results = CopilotParser().search_chat_content(workspace_data, patterns, regex=True)
+
+        by_content = {result["full_content"]: result for result in results}
+        assert by_content["How do I run docker compose?"]["match_position"] == 13
+        assert ("Wrap it in try/except." in by_content) == (len(patterns) > 1)
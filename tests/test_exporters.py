@@ -0,0 +1,362 @@
+"""Tests for CodeHist exporters"""
+
+import json
+
+import pytest
+
+from codehist import fastjson
+from codehist.exporters.json import JSONExporter
+from codehist.parsers.copilot import CopilotParser
+
+
+@pytest.fixture
+def workspace_data(vscode_home):
+    return CopilotParser().discover_vscode_copilot_data()
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def json_backend(request, monkeypatch):
+    """Run a test against both the orjson and the standard library encoder"""
+    if request.param == "stdlib":
+        monkeypatch.setattr(fastjson, "orjson", None)
+    elif fastjson.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+
+class TestFastJSON:
+    """Test the orjson/stdlib JSON helpers"""
+
+    def test_round_trip(self, json_backend):
+        """Non-ASCII text survives encoding and decoding"""
+        data = {"content": "Grüße 👋", "count": 2}
+
+        encoded = fastjson.dumps(data)
+        assert "Grüße".encode("utf-8") in encoded
+        assert fastjson.loads(encoded) == data
+
+    def test_dataclasses_use_default(self, json_backend):
+        """Dataclasses and datetimes encode the same way with either backend"""
+        from datetime import datetime
+
+        from codehist.models import Message
+
+        message = Message(role="user", content="hi", timestamp=datetime(2025, 6, 1, 12, 30), id="m1")
+        encoded = fastjson.dumps({"message": message, "at": datetime(2025, 6, 1)}, default=JSONExporter()._json_serializer)
+
+        assert encoded.decode("utf-8").replace(" ", "") == (
+            '{"message":{"id":"m1","role":"user","content":"hi","timestamp":"2025-06-01T12:30:00","metadata":{}},'
+            '"at":"2025-06-01T00:00:00"}'
+        )
+
+    def test_sessions_encode_like_to_dict(self, workspace_data, json_backend):
+        """Encoding a session directly gives the same bytes as encoding its to_dict()"""
+        default = JSONExporter()._json_serializer
+
+        for session in workspace_data.chat_sessions:
+            assert fastjson.dumps(session, indent=True, default=default) == fastjson.dumps(session.to_dict(), indent=True)
+
+    def test_loads_accepts_utf8_bom(self, json_backend):
+        """Files saved with a UTF-8 BOM still decode"""
+        assert fastjson.loads(b"\xef\xbb\xbf" + b'{"a": 1}') == {"a": 1}
+
+
+class TestJSONExporter:
+    """Test JSONExporter"""
+
+    def test_streaming_matches_export_data(self, workspace_data, json_backend, tmp_path):
+        """Streaming export writes the same document as exporting the full dict"""
+        parser = CopilotParser()
+        stats = parser.get_chat_statistics(workspace_data)
+        search_results = parser.search_chat_content(workspace_data, "docker")
+        exporter = JSONExporter()
+
+        exporter.export_data(
+            {"chat_data": workspace_data.to_dict(), "statistics": stats, "search_results": search_results},
+            tmp_path / "full.json"
+        )
+        exporter.export_data_streaming(workspace_data, stats, tmp_path / "streamed.json", search_results)
+
+        full = (tmp_path / "full.json").read_text(encoding="utf-8")
+        streamed = (tmp_path / "streamed.json").read_text(encoding="utf-8")
+        assert json.loads(streamed) == json.loads(full)
+        assert streamed == full
+
+    def test_streaming_without_sessions(self, json_backend, tmp_path):
+        """An empty workspace still produces a valid document"""
+        from codehist.models import WorkspaceData
+
+        output = tmp_path / "nested" / "empty.json"
+        JSONExporter().export_data_streaming(WorkspaceData(agent="GitHub Copilot"), {}, output)
+
+        data = json.loads(output.read_text(encoding="utf-8"))
+        assert data["chat_data"]["chat_sessions"] == []
+        assert "search_results" not in data
+
+    def test_ndjson_has_header_then_sessions(self, workspace_data, json_backend, tmp_path):
+        """NDJSON export writes a header line followed by one line per session"""
+        parser = CopilotParser()
+        stats = parser.get_chat_statistics(workspace_data)
+        output = tmp_path / "chat.ndjson"
+
+        JSONExporter().export_ndjson(workspace_data, stats, output)
+
+        header, *sessions = [json.loads(line) for line in output.read_bytes().splitlines()]
+        chat_data = workspace_data.to_dict()
+        assert header["statistics"] == stats
+        assert "search_results" not in header
+        assert header["chat_data"] == {k: v for k, v in chat_data.items() if k != "chat_sessions"}
+        assert sessions == chat_data["chat_sessions"]
+
+    def test_jsonl_appends_only_changed_sessions(self, workspace_data, json_backend, tmp_path):
+        """An incremental JSON Lines export appends new and grown sessions only"""
+        output = tmp_path / "sessions.jsonl"
+        exporter = JSONExporter()
+
+        written, exported = exporter.export_sessions_jsonl(workspace_data, output)
+        lines = output.read_bytes().splitlines()
+        assert written == len(lines) == 3
+        assert [json.loads(line) for line in lines] == [s.to_dict() for s in workspace_data.chat_sessions]
+
+        workspace_data.chat_sessions[0].messages.pop()
+        written, _ = exporter.export_sessions_jsonl(workspace_data, output, exported=exported)
+        lines = output.read_bytes().splitlines()
+        assert written == 1
+        assert len(lines) == 4
+        assert json.loads(lines[-1]) == workspace_data.chat_sessions[0].to_dict()
+
+    def test_jsonl_sessions_without_id_are_not_repeated(self, workspace_data, json_backend, tmp_path):
+        """Sessions without a session_id are appended once, not on every incremental run"""
+        output = tmp_path / "sessions.jsonl"
+        exporter = JSONExporter()
+        workspace_data.chat_sessions[0].session_id = None
+
+        _, exported = exporter.export_sessions_jsonl(workspace_data, output)
+        written, _ = exporter.export_sessions_jsonl(workspace_data, output, exported=exported)
+
+        assert written == 0
+        assert len(output.read_bytes().splitlines()) == 3
+
+    def test_jsonl_keeps_editing_sessions_without_id(self, vscode_home, json_backend, tmp_path):
+        """Editing sessions without a sessionId are all written, and only once"""
+        editing_dir = vscode_home / ".config" / "Code" / "User" / "workspaceStorage" / "ws1" / "chatEditingSessions"
+        for name in ("edit1", "edit2"):
+            (editing_dir / name).mkdir(parents=True)
+            (editing_dir / name / "state.json").write_text('{"linearHistory": []}')
+        workspace_data = CopilotParser().discover_vscode_copilot_data()
+        output = tmp_path / "sessions.jsonl"
+        exporter = JSONExporter()
+
+        written, exported = exporter.export_sessions_jsonl(workspace_data, output)
+        assert written == len(output.read_bytes().splitlines()) == len(workspace_data.chat_sessions) == 5
+
+        written, _ = exporter.export_sessions_jsonl(workspace_data, output, exported=exported)
+        assert written == 0
+        assert len(output.read_bytes().splitlines()) == 5
+
+    def test_jsonl_chat_and_editing_sessions_sharing_an_id(self, workspace_data, json_backend, tmp_path):
+        """A chat session and an editing session with the same ID are tracked separately"""
+        output = tmp_path / "sessions.jsonl"
+        exporter = JSONExporter()
+        for session in workspace_data.chat_sessions:
+            session.session_id = "shared"
+
+        written, exported = exporter.export_sessions_jsonl(workspace_data, output)
+        for _ in range(2):
+            written, exported = exporter.export_sessions_jsonl(workspace_data, output, exported=exported)
+            assert written == 0
+
+        assert len(output.read_bytes().splitlines()) == 3
+
+
+class TestChunkedJSONExporter:
+    """Test ChunkedJSONExporter"""
+
+    def test_chunked_export_matches_single_dump(self, workspace_data, json_backend, tmp_path):
+        """Streaming chunks into the file gives the same document as dumping it whole"""
+        from codehist.exporters.chunked_json import ChunkedJSONExporter
+
+        parser = CopilotParser()
+        chat_data = workspace_data.to_dict()
+        data = {
+            "chat_data": chat_data,
+            "statistics": parser.get_chat_statistics(workspace_data),
+            "search_results": parser.search_chat_content(workspace_data, "docker"),
+        }
+        expected = {
+            "statistics": data["statistics"],
+            "search_results": data["search_results"],
+            "chat_data": {
+                "agent": chat_data["agent"],
+                "version": chat_data["version"],
+                "workspace_path": chat_data["workspace_path"],
+                "metadata": chat_data["metadata"],
+                "chat_sessions": chat_data["chat_sessions"],
+            },
+        }
+        exporter = ChunkedJSONExporter(chunk_size=2)
+
+        exporter.export_data(expected, tmp_path / "single.json")
+        exporter.export_data_chunked(data, tmp_path / "chunked.json")
+
+        assert (tmp_path / "chunked.json").read_bytes() == (tmp_path / "single.json").read_bytes()
+
+    def test_parallel_chunks_match_serial(self, workspace_data, monkeypatch, tmp_path):
+        """Encoding chunks in worker processes writes the same file"""
+        from codehist.exporters import chunked_json
+        from codehist.exporters.chunked_json import ChunkedJSONExporter
+
+        monkeypatch.setattr(fastjson, "orjson", None)
+        monkeypatch.setattr(chunked_json, "MIN_PARALLEL_CHUNKS", 1)
+        data = {"chat_data": workspace_data.to_dict(), "statistics": {}}
+        exporter = ChunkedJSONExporter(chunk_size=1)
+
+        exporter.export_data_chunked(data, tmp_path / "serial.json")
+        exporter.export_data_chunked(data, tmp_path / "parallel.json", jobs=2)
+
+        assert (tmp_path / "parallel.json").read_bytes() == (tmp_path / "serial.json").read_bytes()
+
+    def test_msgpack_round_trip(self, workspace_data, tmp_path):
+        """The MessagePack export unpacks to the same document as the JSON one"""
+        msgpack = pytest.importorskip("msgpack")
+
+        from codehist.exporters.chunked_json import ChunkedJSONExporter
+
+        parser = CopilotParser()
+        data = {
+            "chat_data": workspace_data.to_dict(),
+            "statistics": parser.get_chat_statistics(workspace_data),
+            "search_results": parser.search_chat_content(workspace_data, "docker"),
+        }
+        output = tmp_path / "chat.msgpack"
+
+        ChunkedJSONExporter().export_data_msgpack(data, output)
+
+        assert msgpack.unpackb(output.read_bytes(), raw=False) == json.loads(fastjson.dumps(data))
+
+    def test_sessions_csv_aggregates(self, workspace_data, tmp_path):
+        """The CSV summary counts roles and characters per session"""
+        import csv
+
+        from codehist.exporters.chunked_json import ChunkedJSONExporter
+
+        output = tmp_path / "sessions.csv"
+        ChunkedJSONExporter().export_sessions_to_csv(workspace_data, output, include_message_content=True)
+
+        with open(output, newline="", encoding="utf-8") as f:
+            rows = {row["session_id"]: row for row in csv.DictReader(f)}
+        session = next(s for s in workspace_data.chat_sessions if s.session_id == "session0")
+        total_chars = sum(len(m.content) for m in session.messages)
+        row = rows["session0"]
+        assert int(row["message_count"]) == len(session.messages)
+        assert int(row["user_messages"]) == sum(m.role == "user" for m in session.messages)
+        assert int(row["assistant_messages"]) == sum(m.role == "assistant" for m in session.messages)
+        assert int(row["total_chars"]) == total_chars
+        assert float(row["avg_message_length"]) == total_chars / len(session.messages)
+        assert row["first_user_message"] == "How do I run docker compose?"
+
+    def test_messages_parquet_encoding(self, workspace_data, tmp_path):
+        """Repeated columns are dictionary encoded and every column is zstd compressed"""
+        pq = pytest.importorskip("pyarrow.parquet")
+
+        from codehist.exporters.chunked_json import ChunkedJSONExporter
+
+        output = tmp_path / "messages.parquet"
+        ChunkedJSONExporter().export_messages_to_parquet(workspace_data, output)
+
+        parquet_file = pq.ParquetFile(output)
+        schema = parquet_file.schema_arrow
+        assert str(schema.field("role").type).startswith("dictionary")
+        assert str(schema.field("timestamp").type).startswith("timestamp")
+        row_group = parquet_file.metadata.row_group(0)
+        assert {row_group.column(i).compression for i in range(row_group.num_columns)} == {"ZSTD"}
+        assert parquet_file.metadata.num_rows == sum(len(s.messages) for s in workspace_data.chat_sessions)
+
+    def test_messages_parquet_timestamps_are_utc(self, tmp_path):
+        """Aware timestamps keep their instant and naive ones are read as local time"""
+        pq = pytest.importorskip("pyarrow.parquet")
+
+        from datetime import datetime, timedelta, timezone
+        from codehist.exporters.chunked_json import ChunkedJSONExporter
+        from codehist.models import ChatSession, Message, WorkspaceData
+
+        aware = datetime(2025, 6, 15, 14, 0, tzinfo=timezone(timedelta(hours=2)))
+        naive = datetime(2025, 6, 15, 12, 0)
+        workspace_data = WorkspaceData(agent="GitHub Copilot", chat_sessions=[ChatSession(
+            agent="GitHub Copilot",
+            timestamp=aware,
+            messages=[Message("user", "Hello", aware), Message("assistant", "Hi", naive)],
+            session_id="s"
+        )])
+
+        output = tmp_path / "messages.parquet"
+        ChunkedJSONExporter().export_messages_to_parquet(workspace_data, output)
+
+        table = pq.read_table(output)
+        assert str(table.schema.field("timestamp").type) == "timestamp[us, tz=UTC]"
+        assert table.column("timestamp").to_pylist() == [aware, naive.astimezone()]
+
+    def test_messages_parquet_streams_row_groups(self, workspace_data, tmp_path):
+        """Messages are written in row groups of chunk_size, in session order"""
+        pq = pytest.importorskip("pyarrow.parquet")
+
+        from codehist.exporters.chunked_json import ChunkedJSONExporter
+
+        output = tmp_path / "messages.parquet"
+        ChunkedJSONExporter().export_messages_to_parquet(workspace_data, output, chunk_size=2)
+
+        parquet_file = pq.ParquetFile(output)
+        messages = [m for s in workspace_data.chat_sessions for m in s.messages]
+        assert parquet_file.metadata.num_row_groups == (len(messages) + 1) // 2
+        assert parquet_file.read().column("content").to_pylist() == [m.content for m in messages]
+
+
+class TestMarkdownExporter:
+    """Test MarkdownExporter"""
+
+    def test_batched_write_matches_joined_content(self, workspace_data, monkeypatch, tmp_path):
+        """Writing in small batches gives the same file as one joined write"""
+        from codehist.exporters import markdown
+        from codehist.exporters.markdown import MarkdownExporter
+
+        parser = CopilotParser()
+        data = {
+            "chat_data": workspace_data.to_dict(),
+            "statistics": parser.get_chat_statistics(workspace_data),
+        }
+        MarkdownExporter().export_chat_data(data, tmp_path / "single.md")
+        monkeypatch.setattr(markdown, "WRITE_BATCH_CHARS", 16)
+        MarkdownExporter().export_chat_data(data, tmp_path / "batched.md")
+
+        def without_export_date(path):
+            return [line for line in path.read_bytes().split(b"\n") if not line.startswith(b"**Export Date:**")]
+
+        single = without_export_date(tmp_path / "single.md")
+        assert single[0] == b"# GitHub Copilot Chat History"
+        assert without_export_date(tmp_path / "batched.md") == single
+
+
+class TestAnalyzeJSONFile:
+    """Test analyze_json_file_chunks"""
+
+    def test_detects_sessions_anywhere_in_file(self, workspace_data, tmp_path):
+        """Session data is found even when it starts after a large statistics block"""
+        from codehist.exporters.chunked_json import analyze_json_file_chunks
+
+        output = tmp_path / "export.json"
+        stats = {"padding": "x" * 20000}
+        JSONExporter().export_data({"statistics": stats, "chat_data": workspace_data.to_dict()}, output)
+
+        analysis = analyze_json_file_chunks(output)
+
+        assert analysis["contains_sessions"] is True
+        assert analysis["role_entries"] == sum(len(s.messages) for s in workspace_data.chat_sessions)
+
+    def test_empty_file(self, tmp_path):
+        """An empty file is reported as not containing sessions"""
+        from codehist.exporters.chunked_json import analyze_json_file_chunks
+
+        output = tmp_path / "empty.json"
+        output.write_bytes(b"")
+
+        assert analyze_json_file_chunks(output)["contains_sessions"] is False
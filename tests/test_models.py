@@ -0,0 +1,171 @@
+"""Tests for CodeHist data models"""
+
+import gc
+from datetime import datetime
+
+from codehist.models import ChatSession, Message, WorkspaceData, compute_chat_statistics, gc_paused, parse_timestamp
+
+
+def _session(session_id, workspace, timestamp, message_times, session_type="chat_session"):
+    messages = [
+        Message(role="user", content=f"message {i}", timestamp=t, metadata={"type": "user_request"})
+        for i, t in enumerate(message_times)
+    ]
+    return ChatSession(
+        agent="GitHub Copilot",
+        timestamp=timestamp,
+        messages=messages,
+        workspace=workspace,
+        session_id=session_id,
+        metadata={"type": session_type}
+    )
+
+
+class TestChatStatistics:
+    """Test compute_chat_statistics"""
+
+    def test_aggregates(self):
+        """Counts, workspace activity and date range are computed correctly"""
+        sessions = [
+            _session("a", "/p/api", datetime(2025, 6, 2), [datetime(2025, 6, 2), datetime(2025, 6, 5)]),
+            _session("b", "/p/api", datetime(2025, 6, 1), [datetime(2025, 6, 3)]),
+            _session("c", None, datetime(2025, 6, 4), [], session_type="chat_editing_session"),
+        ]
+
+        stats = compute_chat_statistics(sessions)
+
+        assert stats["total_sessions"] == 3
+        assert stats["total_messages"] == 3
+        assert stats["session_types"] == {"chat_session": 2, "chat_editing_session": 1}
+        assert stats["message_types"] == {"user_request": 3}
+        assert stats["agent_activity"] == {"GitHub Copilot": 3}
+        assert stats["workspace_activity"]["/p/api"] == {
+            "sessions": 2,
+            "messages": 3,
+            "first_seen": "2025-06-01T00:00:00",
+            "last_seen": "2025-06-02T00:00:00",
+        }
+        assert stats["workspace_activity"]["unknown_workspace"]["sessions"] == 1
+        assert stats["date_range"] == {"earliest": "2025-06-01T00:00:00", "latest": "2025-06-05T00:00:00"}
+
+    def test_empty(self):
+        """No sessions give zero counts and an empty date range"""
+        stats = WorkspaceData(agent="GitHub Copilot").stats
+
+        assert stats["total_sessions"] == 0
+        assert stats["date_range"] == {"earliest": None, "latest": None}
+
+
+class TestGCPaused:
+    """Test the gc_paused context manager"""
+
+    def test_restores_collector_state(self):
+        """The collector is paused inside the block and its previous state restored after"""
+        assert gc.isenabled()
+        with gc_paused():
+            assert not gc.isenabled()
+            with gc_paused():
+                assert not gc.isenabled()
+            assert not gc.isenabled()
+        assert gc.isenabled()
+
+    def test_round_trip_unchanged(self):
+        """to_dict/from_dict give the same data with the collector paused"""
+        data = WorkspaceData(
+            agent="GitHub Copilot",
+            chat_sessions=[_session("a", "/p/api", datetime(2025, 6, 2), [datetime(2025, 6, 2)])]
+        )
+
+        assert WorkspaceData.from_dict(data.to_dict()).to_dict() == data.to_dict()
+        assert gc.isenabled()
+
+
+class TestSlots:
+    """Test the slotted models"""
+
+    def test_no_instance_dict(self):
+        """Models store their fields in slots"""
+        session = _session("a", "/p/api", datetime(2025, 6, 2), [datetime(2025, 6, 2)])
+
+        assert not hasattr(session, "__dict__")
+        assert not hasattr(session.messages[0], "__dict__")
+        assert not hasattr(WorkspaceData(agent="GitHub Copilot"), "__dict__")
+
+    def test_pickle_round_trip(self):
+        """Slotted models, including the statistics cache, survive pickling"""
+        import pickle
+
+        data = WorkspaceData(
+            agent="GitHub Copilot",
+            chat_sessions=[_session("a", "/p/api", datetime(2025, 6, 2), [datetime(2025, 6, 2)])]
+        )
+        stats = data.stats
+
+        restored = pickle.loads(pickle.dumps(data))
+
+        assert restored == data
+        assert restored.stats == stats
+        restored.chat_sessions = []
+        assert restored.stats["total_sessions"] == 0
+
+
+class TestMessage:
+    """Test the Message constructor"""
+
+    def test_positional_signature(self):
+        """role, content, timestamp, id and metadata can all be passed positionally"""
+        message = Message("user", "Hello", datetime(2025, 6, 1), "req1", {"type": "user_request"})
+
+        assert message.id == "req1"
+        assert message.metadata == {"type": "user_request"}
+        assert list(message.to_dict()) == ["id", "role", "content", "timestamp", "metadata"]
+
+
+class TestParseTimestamp:
+    """Test parse_timestamp"""
+
+    def test_isoformat_round_trip(self):
+        """Timestamps written by to_dict() parse back to the same value"""
+        from datetime import timezone
+
+        for value in (datetime(2025, 6, 1, 12, 30, 5, 123456), datetime(2025, 6, 1, tzinfo=timezone.utc)):
+            assert parse_timestamp(value.isoformat()) == value
+
+    def test_falls_back_to_dateutil(self):
+        """Strings fromisoformat rejects are still parsed"""
+        assert parse_timestamp("June 1 2025 12:30") == datetime(2025, 6, 1, 12, 30)
+
+
+class TestMessageFromDicts:
+    """Test Message.from_dicts"""
+
+    def test_matches_from_dict(self):
+        """Bulk construction gives the same messages as from_dict, on both paths"""
+        exported = [m.to_dict() for m in _session("a", None, datetime(2025, 6, 2), [datetime(2025, 6, 2, 9)]).messages]
+        lenient = [{"content": "hi", "timestamp": "June 1 2025"}, {"role": "assistant", "timestamp": datetime(2025, 6, 1)}]
+
+        for items in (exported, lenient):
+            assert Message.from_dicts(items) == [Message.from_dict(item) for item in items]
+
+
+class TestContentLower:
+    """Test Message.content_lower"""
+
+    def test_cached_until_content_changes(self):
+        """The lowercased content is computed once and recomputed after content is reassigned"""
+        message = Message("user", "Docker Compose", datetime(2025, 6, 1))
+
+        assert message.content_lower == "docker compose"
+        assert message.content_lower is message.content_lower
+
+        message.content = "Error Handling"
+        assert message.content_lower == "error handling"
+
+    def test_not_exported(self):
+        """The cache is not part of the message's equality or dict form"""
+        message = Message("user", "Docker", datetime(2025, 6, 1))
+        fresh = Message("user", "Docker", datetime(2025, 6, 1))
+        message.content_lower
+
+        assert message == fresh
+        assert message.to_dict() == fresh.to_dict()